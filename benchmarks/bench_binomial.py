@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmarks for the binomial pricer and the delta-hedge simulator.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_binomial
+    python -m benchmarks.bench_binomial --compare benchmarks/results/baseline.json
+
+Each case is timed timeit-style (auto-ranged loop, best of --repeat runs) and
+the results are written as JSON. With --compare, the run exits with status 1
+if any case's calls per second fell more than --threshold below the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from binomial_options import node_table, option_and_delta, option_greeks, price_grid, simulate_delta_hedge
+from binomial_options.kernels import HAVE_NUMBA
+from binomial_options.reference import binomial_return, create_tree, option_delta, option_value
+
+SPOT = 100
+STRIKE = 110
+CALLPUT = "c"
+UP_PROBABILITY = .5
+# keep the same total volatility at every step count so the trees stay comparable
+TOTAL_VOL = .1 * 3**.5
+
+
+def up_return_for(steps):
+    return TOTAL_VOL / steps**.5
+
+
+def pricing_cases(steps):
+    up_return = up_return_for(steps)
+    down_return = up_return
+    tree = create_tree(SPOT, steps, UP_PROBABILITY, up_return, 1 - UP_PROBABILITY, down_return)
+    value = option_value(tree, STRIKE, CALLPUT)
+    return {
+        f'binomial_return[steps={steps}]': lambda: binomial_return(steps // 2, up_return, UP_PROBABILITY, SPOT, steps),
+        f'create_tree[steps={steps}]': lambda: create_tree(SPOT, steps, UP_PROBABILITY, up_return, 1 - UP_PROBABILITY, down_return),
+        f'option_value[steps={steps}]': lambda: option_value(tree, STRIKE, CALLPUT),
+        f'option_delta[steps={steps}]': lambda: option_delta(SPOT, UP_PROBABILITY, up_return, 1 - UP_PROBABILITY, down_return, steps, STRIKE, CALLPUT, value),
+        f'lattice.option_and_delta[steps={steps}]': lambda: option_and_delta(SPOT, STRIKE, CALLPUT, steps, UP_PROBABILITY, up_return, 1 - UP_PROBABILITY, down_return),
+        f'lattice.option_greeks[steps={steps}]': lambda: option_greeks(SPOT, STRIKE, CALLPUT, steps, UP_PROBABILITY, up_return),
+        f'lattice.price_grid[steps={steps},spots=50,strikes=100]': lambda: price_grid(np.linspace(80, 120, 50), np.linspace(50, 150, 100), CALLPUT, steps, UP_PROBABILITY, up_return, as_frame=False),
+    }
+
+
+def simulation_cases(steps, path_counts):
+    up_return = up_return_for(steps)
+    cases = {f'node_table[steps={steps}]': lambda: node_table(SPOT, steps, STRIKE, CALLPUT, UP_PROBABILITY, up_return)}
+    for n_paths in path_counts:
+        # seeded so every run times the same paths; the node table cache is warm after the first call
+        cases[f'simulate_delta_hedge[steps={steps},paths={n_paths}]'] = (
+            lambda n_paths=n_paths: simulate_delta_hedge(n_paths, steps, SPOT, STRIKE, CALLPUT, UP_PROBABILITY, up_return, rng=0, backend='numpy'))
+        cases[f'simulate_delta_hedge[steps={steps},paths={n_paths},band=.05]'] = (
+            lambda n_paths=n_paths: simulate_delta_hedge(n_paths, steps, SPOT, STRIKE, CALLPUT, UP_PROBABILITY, up_return, rng=0,
+                                                         rebalance_band=.05, backend='numpy'))
+        if HAVE_NUMBA:
+            cases[f'simulate_delta_hedge[steps={steps},paths={n_paths},band=.05,backend=numba]'] = (
+                lambda n_paths=n_paths: simulate_delta_hedge(n_paths, steps, SPOT, STRIKE, CALLPUT, UP_PROBABILITY, up_return, rng=0,
+                                                             rebalance_band=.05, backend='numba'))
+    return cases
+
+
+def time_case(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {'seconds_per_call': best, 'calls_per_second': 1 / best}
+
+
+def compare(results, baseline, threshold):
+    """Names of cases whose throughput dropped more than threshold below the baseline."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['calls_per_second'] / baseline[name]['calls_per_second']
+        result['vs_baseline'] = ratio
+        if ratio < 1 - threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, nargs='+', default=[3, 50, 500, 5000], help='step counts for the pricing cases')
+    parser.add_argument('--sim-steps', type=int, nargs='+', default=[3, 50, 500], help='step counts for the hedge simulation cases')
+    parser.add_argument('--paths', type=int, nargs='+', default=[1_000, 100_000], help='path counts for the hedge simulation cases')
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs per case; the best is kept')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results', time.strftime('bench-%Y%m%d-%H%M%S.json')))
+    parser.add_argument('--compare', help='baseline JSON from an earlier run')
+    parser.add_argument('--threshold', type=float, default=.25, help='allowed fractional throughput drop vs the baseline')
+    args = parser.parse_args(argv)
+
+    cases = {}
+    for steps in args.steps:
+        cases.update(pricing_cases(steps))
+    for steps in args.sim_steps:
+        cases.update(simulation_cases(steps, args.paths))
+
+    results = {}
+    for name, func in cases.items():
+        if args.filter in name:
+            results[name] = time_case(func, args.repeat)
+            print(f"{name:<60} {results[name]['seconds_per_call']*1e3:12.4f} ms {results[name]['calls_per_second']:14.1f} /s")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)['results'], args.threshold)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"\nwrote {args.output}")
+
+    if regressions:
+        print(f"\nthroughput regressed more than {args.threshold:.0%} vs {args.compare}:")
+        for name in regressions:
+            print(f"  {name}: {results[name]['vs_baseline']:.2f}x baseline")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
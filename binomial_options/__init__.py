@@ -0,0 +1,19 @@
+from binomial_options.lattice import (
+    backward_induction,
+    cached_node_table,
+    implied_down_return,
+    node_table,
+    option_and_delta,
+    option_greeks,
+    option_payoff,
+    price_grid,
+    terminal_distribution,
+    theo_binomial_distribution,
+)
+from binomial_options.simulate import simulate_delta_hedge, simulate_terminal_hedge
+from binomial_options.recorder import ResultRecorder
+from binomial_options.parallel import run_set, run_sets_parallel
+from binomial_options.streaming import HedgeStatistics, iter_hedge_results, stream_sets
+from binomial_options.sweep import SWEEP_PARAMETERS, sweep_hedges
+from binomial_options.variance import METHODS, compare_methods, estimate_mean_pnl
+from binomial_options.exact import exact_pnl_by_terminal_price, exact_pnl_distribution
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Run the delta-hedge study from the command line, e.g.
+
+    python -m binomial_options --paths 500 --sets 2 --steps 3 --strike 110
+"""
+
+import argparse
+
+from binomial_options.study import run_and_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m binomial_options', description='Monte Carlo delta hedging on a binomial stock process.')
+    parser.add_argument('--paths', type=int, default=500, help='simulations per set')
+    parser.add_argument('--sets', type=int, default=2, help='sets of simulations')
+    parser.add_argument('--steps', type=int, default=3, help='steps until expiry')
+    parser.add_argument('--spot', type=float, default=100, help='initial stock price')
+    parser.add_argument('--strike', type=float, default=110)
+    parser.add_argument('--callput', choices=['c', 'p'], default='c')
+    parser.add_argument('--option-position', type=int, default=1)
+    parser.add_argument('--up-probability', type=float, default=.5)
+    parser.add_argument('--up-return', type=float, default=.1)
+    parser.add_argument('--seed', type=int, help='master seed; fresh entropy if omitted')
+    parser.add_argument('--memory-budget', type=int, help='bytes of path rows to hold before spilling to Parquet')
+    parser.add_argument('--streaming', action='store_true', help='keep running statistics only (constant memory, no path tables)')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='paths per chunk in streaming mode')
+    parser.add_argument('--rebalance-band', type=float, default=0.0, help='only rehedge once the position is this far from delta')
+    parser.add_argument('--backend', choices=['auto', 'numpy', 'numba'], default='auto', help='hedge kernel; auto uses numba if installed')
+    parser.add_argument('--no-plots', dest='plots', action='store_false', help='print results without charts')
+    args = parser.parse_args(argv)
+
+    run_and_report(args.paths, args.sets, args.steps, args.spot, args.strike, args.callput, args.up_probability, args.up_return,
+                   args.option_position, seed=args.seed, memory_budget=args.memory_budget, streaming=args.streaming,
+                   chunk_size=args.chunk_size, plots=args.plots, rebalance_band=args.rebalance_band, backend=args.backend)
+
+
+if __name__ == '__main__':
+    main()
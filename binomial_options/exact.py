@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+The exact distribution of hedged P/L, by dynamic programming over the lattice.
+
+With a rehedge at every step, the P/L a path picks up on each step depends
+only on the edge it takes, so the distribution of cumulative P/L at a node is
+the mixture of its parents' distributions, each shifted by the edge's P/L.
+Carrying those distributions forward node by node gives the true P/L
+distribution at every terminal price, the ground truth for the Monte Carlo
+groupby('terminal_price') tables.
+"""
+
+import numpy as np
+
+from binomial_options.lattice import cached_node_table, terminal_distribution
+
+
+def _edge_pnl(prices, values, deltas, option_position, t):
+    # P/L on the up and down edges out of every node at step t-1, in the hedge kernels' arithmetic
+    held = option_position * deltas[t - 1, :t] * -100
+    contract_value = 100 * option_position
+    up = held * (prices[t, 1:t + 1] - prices[t - 1, :t]) + contract_value * (values[t, 1:t + 1] - values[t - 1, :t])
+    down = held * (prices[t, :t] - prices[t - 1, :t]) + contract_value * (values[t, :t] - values[t - 1, :t])
+    return up, down
+
+
+def _merge_atoms(pnl, probabilities, decimals):
+    pnl, inverse = np.unique(pnl.round(decimals), return_inverse=True)
+    return pnl, np.bincount(inverse, probabilities)
+
+
+def _spread_onto_grid(pnl, probabilities, grid):
+    # split each atom's mass between the two grid points around it, which keeps the mean exact inside the grid;
+    # a grid of one repeated point (a node every path reaches with the same P/L) takes it all on its first point
+    upper = np.clip(np.searchsorted(grid, pnl), 1, len(grid) - 1)
+    lower = upper - 1
+    span = grid[upper] - grid[lower]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(span > 0, np.clip((pnl - grid[lower]) / span, 0, 1), 0.0)
+    return (np.bincount(lower, probabilities * (1 - weight), len(grid))
+            + np.bincount(upper, probabilities * weight, len(grid)))
+
+
+def _node_bounds(prices, values, deltas, option_position):
+    # for t = 1..steps: the edge P/L into layer t and the lowest and highest cumulative P/L reaching each of its nodes
+    low = high = np.zeros(1)
+    for t in range(1, len(prices)):
+        up, down = _edge_pnl(prices, values, deltas, option_position, t)
+        from_up_low, from_up_high = np.append(np.inf, low + up), np.append(-np.inf, high + up)
+        from_down_low, from_down_high = np.append(low + down, np.inf), np.append(high + down, -np.inf)
+        low, high = np.minimum(from_up_low, from_down_low), np.maximum(from_up_high, from_down_high)
+        yield up, down, low, high
+
+
+def pnl_bounds(prices, values, deltas, option_position=1):
+    """Smallest and largest cumulative hedged P/L any path can reach at any step, found by the same recursion."""
+    overall_low, overall_high = 0.0, 0.0
+    for _, _, low, high in _node_bounds(prices, values, deltas, option_position):
+        overall_low, overall_high = min(overall_low, low.min()), max(overall_high, high.max())
+    return overall_low, overall_high
+
+
+def exact_pnl_distribution(steps, start_price, strike, callput, up_probability, up_return, option_position=1, grid=None, decimals=6):
+    """
+    Tidy DataFrame of the exact terminal hedged P/L distribution.
+
+    One row per (terminal node, P/L value) with n_ups, terminal_price, P/L,
+    probability (joint with the node) and conditional_probability (given the
+    node). By default P/L values are exact atoms, merged when they agree to
+    `decimals` places; the number of atoms can grow quickly with steps where
+    the P/L is path dependent. Passing grid instead carries each node's
+    distribution on a fixed set of P/L points, splitting mass linearly between
+    neighbours, so the work is O(steps**2 * len(grid)) whatever the path
+    dependence. grid is either the sorted points, shared by every node, with
+    mass beyond its ends piled on the end points, or a number of points: then
+    each node gets that many evenly spaced points between the lowest and
+    highest P/L reaching it. A parent's range shifted by the edge P/L always
+    falls inside its child's, so nothing is clipped and every node's mean is
+    exact; only the spread is smeared by the splitting.
+    """
+    import pandas as pd
+
+    prices, values, deltas = cached_node_table(start_price, steps, strike, callput, up_probability, up_return)
+    down_probability = 1 - up_probability
+
+    if grid is None:
+        nodes = [(np.zeros(1), np.ones(1))]
+        for t in range(1, steps + 1):
+            up, down = _edge_pnl(prices, values, deltas, option_position, t)
+            layer = []
+            for j in range(t + 1):
+                parts = []
+                if j > 0:
+                    parts.append((nodes[j - 1][0] + up[j - 1], nodes[j - 1][1] * up_probability))
+                if j < t:
+                    parts.append((nodes[j][0] + down[j], nodes[j][1] * down_probability))
+                layer.append(_merge_atoms(np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]), decimals))
+            nodes = layer
+    elif np.ndim(grid) == 0:
+        points = int(grid)
+        grids, mass = np.zeros((1, points)), _spread_onto_grid(np.zeros(1), np.ones(1), np.zeros(points))[np.newaxis]
+        for up, down, low, high in _node_bounds(prices, values, deltas, option_position):
+            child_grids = np.linspace(low, high, points, axis=1)
+            layer = np.zeros_like(child_grids)
+            for j in range(len(grids)):
+                layer[j + 1] += _spread_onto_grid(grids[j] + up[j], mass[j] * up_probability, child_grids[j + 1])
+                layer[j] += _spread_onto_grid(grids[j] + down[j], mass[j] * down_probability, child_grids[j])
+            grids, mass = child_grids, layer
+        nodes = [(g[m > 0], m[m > 0]) for g, m in zip(grids, mass)]
+    else:
+        grid = np.asarray(grid, dtype=float)
+        mass = _spread_onto_grid(np.zeros(1), np.ones(1), grid)[np.newaxis]
+        for t in range(1, steps + 1):
+            up, down = _edge_pnl(prices, values, deltas, option_position, t)
+            layer = np.zeros((t + 1, len(grid)))
+            for j in range(t):
+                layer[j + 1] += _spread_onto_grid(grid + up[j], mass[j] * up_probability, grid)
+                layer[j] += _spread_onto_grid(grid + down[j], mass[j] * down_probability, grid)
+            mass = layer
+        nodes = [(grid[m > 0], m[m > 0]) for m in mass]
+
+    terminal_prices, node_probabilities = terminal_distribution(start_price, steps, up_probability, up_return)
+    frames = [pd.DataFrame({'n_ups': j, 'terminal_price': terminal_prices[j], 'P/L': pnl, 'probability': probabilities,
+                            'conditional_probability': probabilities / node_probabilities[j]})
+              for j, (pnl, probabilities) in enumerate(nodes)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def exact_pnl_by_terminal_price(distribution, decimals=2):
+    """Probability, mean and std of P/L per terminal price, from exact_pnl_distribution; compare HedgeStatistics.pnl_by_terminal_price."""
+    import pandas as pd
+
+    weighted = distribution['P/L'] * distribution['conditional_probability']
+    mean = weighted.groupby(distribution['n_ups']).transform('sum')
+    squared_deviation = (distribution['P/L'] - mean)**2 * distribution['conditional_probability']
+    summary = distribution.assign(weighted=weighted, squared_deviation=squared_deviation).groupby('n_ups').agg(
+        terminal_price=('terminal_price', 'first'), probability=('probability', 'sum'),
+        mean=('weighted', 'sum'), variance=('squared_deviation', 'sum'))
+    return pd.DataFrame({
+        'terminal_price': summary['terminal_price'].round(decimals).values,
+        'probability': summary['probability'].values,
+        'mean_P/L': summary['mean'].values,
+        'std_P/L': np.sqrt(summary['variance']).values,
+    })
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Hedge kernels: path generation and hedge P/L accumulation from uniform draws.
+
+The same per-path loop (_hedge_loop) is compiled with Numba when it is
+installed; the NumPy backend is vectorized across paths instead. Both take the
+uniforms from the caller and do the same floating point operations in the
+same order, so they return identical arrays.
+"""
+
+import functools
+import importlib.util
+
+import numpy as np
+
+HAVE_NUMBA = importlib.util.find_spec('numba') is not None
+BACKENDS = ('auto', 'numpy', 'numba')
+
+
+def _hedge_loop(uniforms, up_probability, prices, values, deltas, option_position, band_shares, rebalance_every, cost_per_share,
+                n_ups, share_price, option_price, option_delta, share_position, cumulative_pnl, cumulative_cost):
+    n_paths, steps = uniforms.shape
+    contract_value = 100 * option_position
+    for i in range(n_paths):
+        ups = 0
+        share_price[i, 0] = prices[0, 0]
+        option_price[i, 0] = values[0, 0]
+        option_delta[i, 0] = deltas[0, 0]
+        held = option_position * deltas[0, 0] * -100
+        share_position[i, 0] = held
+        cost = cost_per_share * abs(held)
+        cumulative_cost[i, 0] = cost
+        cumulative = 0.0 - cost
+        cumulative_pnl[i, 0] = cumulative
+        for t in range(1, steps + 1):
+            if uniforms[i, t - 1] < up_probability:
+                ups += 1
+            n_ups[i, t] = ups
+            share_price[i, t] = prices[t, ups]
+            option_price[i, t] = values[t, ups]
+            option_delta[i, t] = deltas[t, ups]
+            pnl = held * (share_price[i, t] - share_price[i, t - 1]) + contract_value * (option_price[i, t] - option_price[i, t - 1])
+
+            # only trade back to delta on rebalance steps, and once the position has drifted past the band
+            target = option_position * option_delta[i, t] * -100
+            previous = held
+            if t % rebalance_every == 0 and abs(target - held) > band_shares:
+                held = target
+            share_position[i, t] = held
+
+            # the position left at expiry settles with the option, so that last trade is free
+            cost = cost_per_share * abs(held - previous) if t < steps else 0.0
+            cumulative_cost[i, t] = cumulative_cost[i, t - 1] + cost
+            cumulative += pnl - cost
+            cumulative_pnl[i, t] = cumulative
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_hedge_loop():
+    # numba is slow to import, so it is only loaded when the backend is first used
+    import numba
+
+    return numba.njit(cache=True, nogil=True)(_hedge_loop)
+
+
+def _hedge_numpy(uniforms, up_probability, prices, values, deltas, option_position, band_shares, rebalance_every, cost_per_share,
+                 n_ups, share_price, option_price, option_delta, share_position, cumulative_pnl, cumulative_cost):
+    steps = uniforms.shape[1]
+    np.cumsum(uniforms < up_probability, axis=1, out=n_ups[:, 1:])
+
+    step_index = np.arange(steps + 1)
+    share_price[:] = prices[step_index, n_ups]
+    option_price[:] = values[step_index, n_ups]
+    option_delta[:] = deltas[step_index, n_ups]
+
+    target = option_position * option_delta * -100
+    if band_shares == 0 and rebalance_every == 1:
+        share_position[:] = target
+    else:
+        # the band and interval make each position depend on the last one, so walk the steps
+        share_position[:, 0] = target[:, 0]
+        for t in range(1, steps + 1):
+            held = share_position[:, t - 1]
+            if t % rebalance_every:
+                share_position[:, t] = held
+            else:
+                share_position[:, t] = np.where(np.abs(target[:, t] - held) > band_shares, target[:, t], held)
+
+    share_pnl = share_position[:, :-1] * np.diff(share_price, axis=1)
+    option_pnl = 100 * option_position * np.diff(option_price, axis=1)
+    if cost_per_share == 0:
+        cumulative_cost[:] = 0.0
+        cumulative_pnl[:, 0] = 0.0
+        np.cumsum(share_pnl + option_pnl, axis=1, out=cumulative_pnl[:, 1:])
+        return
+
+    cost = np.empty_like(share_position)
+    cost[:, 0] = cost_per_share * np.abs(share_position[:, 0])
+    cost[:, 1:] = cost_per_share * np.abs(np.diff(share_position, axis=1))
+    if steps > 0:
+        # the position left at expiry settles with the option, so that last trade is free
+        cost[:, -1] = 0.0
+    np.cumsum(cost, axis=1, out=cumulative_cost)
+
+    increments = np.empty_like(share_position)
+    increments[:, 0] = 0.0 - cost[:, 0]
+    increments[:, 1:] = share_pnl + option_pnl - cost[:, 1:]
+    np.cumsum(increments, axis=1, out=cumulative_pnl)
+
+
+def hedge_paths(uniforms, up_probability, prices, values, deltas, option_position=1, band_shares=0.0, rebalance_every=1, cost_per_share=0.0,
+                backend='auto'):
+    """
+    Walk every path through the node tables and accumulate its hedge P/L.
+
+    uniforms is an (n_paths, steps) array of U(0, 1) draws; a draw below
+    up_probability is an up move. The share position is reset to delta only
+    on every rebalance_every-th step, and then only when it is more than
+    band_shares away from it. Each trade, including the initial hedge, costs
+    cost_per_share per share traded. backend is 'numpy', 'numba' or 'auto'
+    (numba if installed). Returns the simulate_delta_hedge dict.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, not {backend!r}")
+    if backend == 'numba' and not HAVE_NUMBA:
+        raise ImportError("the numba backend needs numba installed")
+    if rebalance_every < 1:
+        raise ValueError(f"rebalance_every must be at least 1, not {rebalance_every!r}")
+
+    n_paths, steps = uniforms.shape
+    n_ups = np.zeros((n_paths, steps + 1), dtype=np.int64)
+    share_price, option_price, option_delta, share_position = (np.empty((n_paths, steps + 1)) for _ in range(4))
+    cumulative_pnl, cumulative_cost = np.empty((n_paths, steps + 1)), np.empty((n_paths, steps + 1))
+
+    kernel = _numba_hedge_loop() if backend == 'numba' or (backend == 'auto' and HAVE_NUMBA) else _hedge_numpy
+    kernel(uniforms, up_probability, prices, values, deltas, option_position, band_shares, rebalance_every, cost_per_share,
+           n_ups, share_price, option_price, option_delta, share_position, cumulative_pnl, cumulative_cost)
+
+    return {
+        'n_ups': n_ups,
+        'share_price': share_price,
+        'option_price': option_price,
+        'option_delta': option_delta,
+        'share_position': share_position,
+        'cumulative_portfolio_P/L': cumulative_pnl,
+        'cumulative_trading_cost': cumulative_cost,
+    }
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized recombining-lattice pricing for the binomial stock process.
+
+Nodes are indexed by the number of up moves, so the terminal layer of an
+n-step tree is an array of length n+1. Binomial weights are built in log
+space, which keeps them finite long after math.factorial overflows.
+"""
+
+import functools
+
+import numpy as np
+
+NODE_TABLE_CACHE_SIZE = 32
+
+
+def implied_down_return(up_probability, up_return):
+    # the stock is a martingale: up_probability*up_return == down_probability*down_return
+    return ((1 - up_probability) / up_probability) * up_return
+
+
+def log_factorials(n):
+    # log(k!) for k = 0..n straight from lgamma; a running sum of logs drifts by ~1e-8 at 100k steps.
+    # scipy is slow to import, so it is only loaded when a lattice is first built
+    from scipy.special import gammaln
+
+    return gammaln(np.arange(n + 1) + 1.0)
+
+
+def terminal_distribution(start_price, steps, up_probability, up_return):
+    """Terminal prices and probabilities for every number of ups, in one pass."""
+    qty_ups = np.arange(steps + 1)
+    qty_downs = steps - qty_ups
+    down_return = implied_down_return(up_probability, up_return)
+
+    log_fact = log_factorials(steps)
+    log_paths = log_fact[steps] - log_fact[qty_ups] - log_fact[qty_downs]
+    log_probability = log_paths + qty_ups * np.log(up_probability) + qty_downs * np.log1p(-up_probability)
+    log_probability -= np.logaddexp.reduce(log_probability)
+    log_growth = qty_ups * np.log1p(up_return) + qty_downs * np.log1p(-down_return)
+
+    return start_price * np.exp(log_growth), np.exp(log_probability)
+
+
+def theo_binomial_distribution(steps, up_return, up_probability, start_price):
+    """(terminal_price, probability) rows for every terminal node, as a (steps+1, 2) array."""
+    return np.column_stack(terminal_distribution(start_price, steps, up_probability, up_return))
+
+
+def option_payoff(prices, strike, callput):
+    if callput == "c":
+        return np.maximum(prices - strike, 0.0)
+    elif callput == "p":
+        return np.maximum(strike - prices, 0.0)
+    raise ValueError(f"callput must be 'c' or 'p', got {callput!r}")
+
+
+def backward_induction(values, up_probability, levels=None):
+    """Roll a layer of node values back `levels` steps (all the way to the root by default)."""
+    if levels is None:
+        levels = len(values) - 1
+    down_probability = 1 - up_probability
+    for _ in range(levels):
+        values = up_probability * values[1:] + down_probability * values[:-1]
+    return values
+
+
+def _layer_table(start_price, steps, strike, callput, up_probability, up_return):
+    prices, _ = terminal_distribution(start_price, steps, up_probability, up_return)
+    table = np.full((steps + 1, steps + 1), np.nan)
+    values = option_payoff(prices, strike, callput)
+    for step in range(steps, -1, -1):
+        table[step, :step + 1] = values
+        values = backward_induction(values, up_probability, 1)
+    return table
+
+
+def node_table(start_price, steps, strike, callput, up_probability, up_return):
+    """
+    Share price, option value and hedge delta at every node of the lattice.
+
+    Each table is indexed [step, number of ups] with NaN above the diagonal; the
+    value at step t is the option with steps-t steps left. Deltas follow
+    option_and_delta: a node's bumped trees are its two children in a lattice one
+    step longer, so they come from a single extra backward induction.
+    """
+    down_return = implied_down_return(up_probability, up_return)
+    down_probability = 1 - up_probability
+
+    step_index = np.arange(steps + 1)[:, None]
+    qty_ups = np.arange(steps + 1)[None, :]
+    with np.errstate(invalid="ignore"):
+        log_growth = qty_ups * np.log1p(up_return) + (step_index - qty_ups) * np.log1p(-down_return)
+    prices = np.where(qty_ups <= step_index, start_price * np.exp(log_growth), np.nan)
+
+    values = _layer_table(start_price, steps, strike, callput, up_probability, up_return)
+    bumped = _layer_table(start_price, steps + 1, strike, callput, up_probability, up_return)
+
+    option_up_delta = (bumped[1:, 1:] - values) / (prices * up_return)
+    option_down_delta = (bumped[1:, :-1] - values) / (-prices * down_return)
+    deltas = option_up_delta * up_probability + option_down_delta * down_probability
+
+    return prices, values, deltas
+
+
+@functools.lru_cache(maxsize=NODE_TABLE_CACHE_SIZE)
+def cached_node_table(start_price, steps, strike, callput, up_probability, up_return):
+    """
+    node_table built once per parameter set and shared by every path that visits it.
+
+    The cache is LRU-bounded so parameter sweeps keep memory flat, and the arrays
+    are returned read-only because every caller sees the same copy.
+    """
+    tables = node_table(start_price, steps, strike, callput, up_probability, up_return)
+    for table in tables:
+        table.setflags(write=False)
+    return tables
+
+
+def _callput_mask(callputs, shape):
+    callputs = np.broadcast_to(np.asarray(callputs), shape)
+    if not np.isin(callputs, ["c", "p"]).all():
+        raise ValueError("callput must be 'c' or 'p'")
+    return callputs == "c"
+
+
+def _value_and_delta(unit_prices, probabilities, spot_price, strikes, is_call, up_probability, up_return, down_probability, down_return):
+    """Rounded value and probability-blended delta of every strike at one spot."""
+    def value(prices):
+        intrinsic = prices[None, :] - strikes[:, None]
+        payoff = np.maximum(np.where(is_call[:, None], intrinsic, -intrinsic), 0.0)
+        return np.round(payoff @ probabilities, 3)
+
+    # the bumped trees in option_delta have the same weights as the base tree,
+    # only their prices are scaled by (1+up_return) or (1-down_return)
+    prices = spot_price * unit_prices
+    option = value(prices)
+    option_up_value = value(prices * (1 + up_return))
+    option_down_value = value(prices * (1 - down_return))
+
+    option_up_delta = (option_up_value - option) / (spot_price * (1 + up_return) - spot_price)
+    option_down_delta = (option_down_value - option) / (spot_price * (1 - down_return) - spot_price)
+
+    return option, option_up_delta * up_probability + option_down_delta * down_probability
+
+
+def option_and_delta(spot_price, strike, callput, steps, up_probability, up_return, down_probability, down_return):
+    """
+    Same inputs and (value, delta) as the per-node create_tree/option_value/option_delta
+    version, but priced from a single terminal distribution.
+    """
+    unit_prices, probabilities = terminal_distribution(1.0, steps, up_probability, up_return)
+    strikes = np.array([strike], dtype=float)
+    option, delta = _value_and_delta(unit_prices, probabilities, spot_price, strikes, _callput_mask(callput, strikes.shape),
+                                     up_probability, up_return, down_probability, down_return)
+    return float(option[0]), float(delta[0])
+
+
+def price_grid(spots, strikes, callputs, steps, up_probability, up_return, down_probability=None, down_return=None, as_frame=True):
+    """
+    Value and delta for every (steps, spot, strike) combination in one call.
+
+    callputs is a single "c"/"p" or a sequence aligned with strikes, and steps may
+    be an int or a sequence. The binomial weights are built once per step count and
+    every strike is evaluated against each spot's terminal layer by broadcasting.
+
+    Returns a tidy DataFrame (one row per combination), or with as_frame=False a
+    (values, deltas) pair of arrays shaped (len(steps), len(spots), len(strikes)).
+    """
+    if down_probability is None:
+        down_probability = 1 - up_probability
+    if down_return is None:
+        down_return = implied_down_return(up_probability, up_return)
+
+    spots = np.atleast_1d(np.asarray(spots, dtype=float))
+    strikes = np.atleast_1d(np.asarray(strikes, dtype=float))
+    step_counts = np.atleast_1d(np.asarray(steps, dtype=int))
+    is_call = _callput_mask(callputs, strikes.shape)
+
+    values = np.empty((len(step_counts), len(spots), len(strikes)))
+    deltas = np.empty_like(values)
+    for a, n in enumerate(step_counts):
+        unit_prices, probabilities = terminal_distribution(1.0, int(n), up_probability, up_return)
+        for b, spot in enumerate(spots):
+            values[a, b], deltas[a, b] = _value_and_delta(unit_prices, probabilities, spot, strikes, is_call,
+                                                          up_probability, up_return, down_probability, down_return)
+
+    if not as_frame:
+        return values, deltas
+
+    import pandas as pd
+
+    n_steps, n_spots, n_strikes = values.shape
+    return pd.DataFrame({
+        'steps': np.repeat(step_counts, n_spots * n_strikes),
+        'spot': np.tile(np.repeat(spots, n_strikes), n_steps),
+        'strike': np.tile(strikes, n_steps * n_spots),
+        'callput': np.tile(np.where(is_call, "c", "p"), n_steps * n_spots),
+        'option_value': values.ravel(),
+        'option_delta': deltas.ravel(),
+    })
+
+
+def option_greeks(spot_price, strike, callput, steps, up_probability, up_return):
+    """
+    Value, delta, gamma and theta from one backward induction over the lattice.
+
+    Delta and gamma are the replicating-hedge differences read off the nodes at
+    steps 1 and 2, and theta is the change in value per step between the root and
+    the middle node at step 2. Greeks that need more steps than the tree has are NaN.
+    """
+    down_return = implied_down_return(up_probability, up_return)
+    prices, _ = terminal_distribution(spot_price, steps, up_probability, up_return)
+
+    values = backward_induction(option_payoff(prices, strike, callput), up_probability, max(steps - 2, 0))
+    layers = [values]
+    while len(layers[0]) > 1:
+        layers.insert(0, backward_induction(layers[0], up_probability, 1))
+    # layers[t] now holds the node values at step t, indexed by number of ups
+
+    option = float(layers[0][0])
+    delta = gamma = theta = float("nan")
+    if steps >= 1:
+        value_down, value_up = layers[1]
+        delta = float((value_up - value_down) / (spot_price * (1 + up_return) - spot_price * (1 - down_return)))
+    if steps >= 2:
+        value_down_down, value_up_down, value_up_up = layers[2]
+        price_down_down = spot_price * (1 - down_return) ** 2
+        price_up_down = spot_price * (1 + up_return) * (1 - down_return)
+        price_up_up = spot_price * (1 + up_return) ** 2
+        delta_up = (value_up_up - value_up_down) / (price_up_up - price_up_down)
+        delta_down = (value_up_down - value_down_down) / (price_up_down - price_down_down)
+        gamma = float((delta_up - delta_down) / (0.5 * (price_up_up - price_down_down)))
+        theta = float((value_up_down - option) / 2)
+
+    return option, delta, gamma, theta
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Run sets of delta-hedge simulations across a process pool.
+
+Every set draws from its own child of one master numpy SeedSequence, and the
+summaries come back in set order, so a given master seed gives bit-identical
+results whatever the number of workers.
+"""
+
+import os
+from itertools import repeat
+
+import numpy as np
+
+from binomial_options.simulate import simulate_delta_hedge
+
+
+def run_set(set_seed, n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, rebalance_band=0.0, backend='auto'):
+    """Simulate one set and summarize its terminal hedged P/L like sets_of_sims_table."""
+    hedge = simulate_delta_hedge(n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position, set_seed,
+                                 rebalance_band, backend)
+    terminal_pnl = hedge['cumulative_portfolio_P/L'][:, -1].round(0)
+    return {
+        'mean_P/L': terminal_pnl.mean(),
+        'sim_total_P/L': terminal_pnl.sum(),
+        'st_dev': terminal_pnl.std(ddof=1),
+    }
+
+
+def run_sets_parallel(sets_of_sims, n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, seed=None, max_workers=None,
+                      rebalance_band=0.0, backend='auto'):
+    """
+    Summaries of sets_of_sims independent sets, numbered from 1 in set order.
+
+    seed is the master seed (an int, or None for fresh entropy). max_workers=1
+    runs in this process; otherwise sets are fanned out over a
+    ProcessPoolExecutor with max_workers processes (all cores by default).
+    """
+    set_seeds = np.random.SeedSequence(seed).spawn(sets_of_sims)
+    args = (set_seeds, repeat(n_paths), repeat(steps), repeat(start_price), repeat(strike), repeat(callput),
+            repeat(up_probability), repeat(up_return), repeat(option_position), repeat(rebalance_band), repeat(backend))
+
+    if max_workers == 1:
+        summaries = list(map(run_set, *args))
+    else:
+        # imported here so the package itself stays cheap to import
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = list(pool.map(run_set, *args, chunksize=max(1, sets_of_sims // (4 * workers))))
+
+    return [{'sim_number': j + 1, **summary} for j, summary in enumerate(summaries)]
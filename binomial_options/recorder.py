@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar result store for simulation output.
+
+Growing a DataFrame with pd.concat copies the whole table on every append.
+ResultRecorder instead writes rows into typed NumPy buffers allocated up front
+and builds the DataFrame once, at the end of the run.
+"""
+
+import os
+
+import numpy as np
+
+
+class ResultRecorder:
+    """
+    Preallocated column buffers for `capacity` rows.
+
+    columns maps column name to dtype. With a memory_budget (in bytes) the
+    buffers hold only as many rows as fit in the budget; when they fill up the
+    rows are written to a Parquet part file under spill_dir (a temporary
+    directory by default) and the buffers are reused. Spilling needs pyarrow
+    or fastparquet.
+    """
+
+    def __init__(self, columns, capacity, memory_budget=None, spill_dir=None):
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in columns.items()}
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+
+        buffer_rows = capacity
+        if memory_budget is not None:
+            row_bytes = sum(dtype.itemsize for dtype in self.dtypes.values())
+            buffer_rows = max(1, min(capacity, memory_budget // row_bytes))
+        self._buffers = {name: np.empty(buffer_rows, dtype) for name, dtype in self.dtypes.items()}
+        self._filled = 0
+        self._rows = 0
+        self._spill_files = []
+
+    def __len__(self):
+        return self._rows
+
+    def append(self, values):
+        """
+        Write a block of rows from a dict of column name to value.
+
+        Array values (of any shape) are flattened and must all have the same
+        size, which is the number of rows written; scalars are repeated on
+        every row. If every value is a scalar a single row is written.
+        """
+        missing = set(self.dtypes) - set(values)
+        if missing:
+            raise ValueError(f"missing columns: {sorted(missing)}")
+
+        values = {name: np.ravel(value) if np.ndim(value) else value for name, value in values.items()}
+        sizes = {np.size(value) for value in values.values() if np.ndim(value)}
+        if len(sizes) > 1:
+            raise ValueError(f"column blocks have different lengths: {sorted(sizes)}")
+        rows = sizes.pop() if sizes else 1
+        if self._rows + rows > self.capacity:
+            raise ValueError(f"recorder is sized for {self.capacity} rows")
+
+        buffer_rows = len(next(iter(self._buffers.values())))
+        start = 0
+        while start < rows:
+            if self._filled == buffer_rows:
+                self._spill()
+            n = min(rows - start, buffer_rows - self._filled)
+            for name, buffer in self._buffers.items():
+                value = values[name]
+                buffer[self._filled:self._filled + n] = value[start:start + n] if np.ndim(value) else value
+            self._filled += n
+            start += n
+        self._rows += rows
+
+    def _buffered_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({name: buffer[:self._filled] for name, buffer in self._buffers.items()}, copy=True)
+
+    def _spill(self):
+        if self.spill_dir is None:
+            import tempfile
+
+            self.spill_dir = tempfile.mkdtemp(prefix='binomial_options-')
+        path = os.path.join(self.spill_dir, f'part-{len(self._spill_files):05d}.parquet')
+        self._buffered_frame().to_parquet(path, index=False)
+        self._spill_files.append(path)
+        self._filled = 0
+
+    def to_frame(self):
+        """Every recorded row as one DataFrame, reading back any spilled parts."""
+        frame = self._buffered_frame()
+        if not self._spill_files:
+            return frame
+
+        import pandas as pd
+
+        parts = [pd.read_parquet(path) for path in self._spill_files]
+        return pd.concat(parts + [frame], ignore_index=True)
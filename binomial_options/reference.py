@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+The original per-node pricing functions, one Python call per tree node.
+
+The lattice module replaces these in the simulation; they are kept as the
+reference the vectorized engine is checked and benchmarked against.
+"""
+
+import math
+import random
+
+
+def binomial_return(qty_ups, up_return, up_probability, start_price, steps):
+    qty_downs = steps - qty_ups
+    down_probability = 1 - up_probability
+    down_return = ((down_probability/up_probability)*up_return)
+    log_paths = math.lgamma(steps+1) - math.lgamma(qty_downs+1) - math.lgamma(qty_ups+1)
+    probability = math.exp(log_paths + qty_ups*math.log(up_probability) + qty_downs*math.log(down_probability))
+    price = start_price * ((1+up_return)**qty_ups) * ((1-down_return)**qty_downs)
+
+    return price, probability
+
+
+def create_tree(start_price, steps, up_probability, up_return, down_probability, down_return):
+    tree = {}
+    for i in range(steps+1):
+        tree[i] = binomial_return(i, up_return, up_probability, start_price, steps)
+    return tree
+
+
+def option_value(tree, strike, callput):
+    in_the_money = []
+    for i in range(len(tree)):
+        if callput == "c" and tree[i][0] > strike:
+            in_the_money.append(tree[i][1]*(tree[i][0]-strike))
+        elif callput == "p" and tree[i][0] < strike:
+            in_the_money.append(tree[i][1]*(strike - tree[i][0]))
+    return round(sum(in_the_money), 3)
+
+
+def option_delta(current_spot_price, up_probability, up_return, down_probability, down_return, steps_til_expiry, strike, callput, current_option_value):
+    option_up_tree = create_tree(current_spot_price*(1+up_return), steps_til_expiry, up_probability, up_return, down_probability, down_return)
+    option_up_value = option_value(option_up_tree, strike, callput)
+
+    option_down_tree = create_tree(current_spot_price*(1-down_return), steps_til_expiry, up_probability, up_return, down_probability, down_return)
+    option_down_value = option_value(option_down_tree, strike, callput)
+
+    option_up_delta = ((option_up_value-current_option_value)/(current_spot_price*(1+up_return)-current_spot_price))
+    option_down_delta = ((option_down_value-current_option_value)/(current_spot_price*(1-down_return)-current_spot_price))
+
+    option_delta = option_up_delta*up_probability + option_down_delta*down_probability
+
+    return option_delta
+
+
+def randomize_stock_price_change(share_price, up_probability, up_return, down_return):
+    if random.random() < up_probability:
+        share_price = share_price * (1+up_return)
+    else:
+        share_price = share_price * (1 - down_return)
+    return round(share_price, 3)
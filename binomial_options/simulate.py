@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo delta hedging on the recombining lattice, vectorized across paths.
+
+A path's state at any step is just (step, number of ups so far), so every path
+reads its share price, option value and delta out of the cached node tables
+instead of repricing.
+"""
+
+import numpy as np
+
+from binomial_options.kernels import hedge_paths
+from binomial_options.lattice import cached_node_table
+
+
+def simulate_delta_hedge(n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, rng=None,
+                         rebalance_band=0.0, backend='auto', rebalance_every=1, cost_per_share=0.0):
+    """
+    Hedge n_paths option positions to expiry, rebalancing to delta at every step.
+
+    rng is anything np.random.default_rng accepts (None, a seed, a SeedSequence
+    or a Generator). Returns a dict of (n_paths, steps+1) arrays; column t is the
+    state after t steps and cumulative_portfolio_P/L is the option plus share
+    P/L, in dollars per 100-share contract, accumulated up to that step, net of
+    cumulative_trading_cost.
+
+    With a rebalance_band (in delta) the shares are only traded back to delta
+    once the hedge has drifted more than the band away from it; rebalance_every
+    only rehedges every that many steps, and every share traded costs
+    cost_per_share. backend picks
+    the hedge kernel ('auto', 'numpy' or 'numba'); every backend gives the
+    same paths and P/L for the same rng.
+    """
+    rng = np.random.default_rng(rng)
+    uniforms = rng.random((n_paths, steps))
+    prices, values, deltas = cached_node_table(start_price, steps, strike, callput, up_probability, up_return)
+    return hedge_paths(uniforms, up_probability, prices, values, deltas, option_position,
+                       rebalance_band * 100 * abs(option_position), rebalance_every, cost_per_share, backend)
+
+
+def simulate_terminal_hedge(n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, rng=None, keep_paths=0,
+                            block_path_steps=2**18, rebalance_band=0.0, backend='auto', rebalance_every=1, cost_per_share=0.0):
+    """
+    Terminal results of simulate_delta_hedge, without keeping every step of every path.
+
+    Paths are hedged in blocks of about block_path_steps path-steps and only
+    their last column is kept, so memory is set by the block, not n_paths. The uniforms
+    are drawn row block by row block from the one stream, so for the same rng
+    the paths are exactly those of simulate_delta_hedge. Returns a dict with
+    n_ups, terminal_price and delta_hedged_P/L (1-D, unrounded) and the
+    share_price rows of the first keep_paths paths.
+    """
+    rng = np.random.default_rng(rng)
+    prices, values, deltas = cached_node_table(start_price, steps, strike, callput, up_probability, up_return)
+    n_ups = np.empty(n_paths, dtype=np.int64)
+    pnl = np.empty(n_paths)
+    block_paths = max(1, block_path_steps // max(steps, 1))
+    kept = []
+    for start in range(0, n_paths, block_paths):
+        stop = min(start + block_paths, n_paths)
+        hedge = hedge_paths(rng.random((stop - start, steps)), up_probability, prices, values, deltas, option_position,
+                            rebalance_band * 100 * abs(option_position), rebalance_every, cost_per_share, backend)
+        n_ups[start:stop] = hedge['n_ups'][:, -1]
+        pnl[start:stop] = hedge['cumulative_portfolio_P/L'][:, -1]
+        if start < keep_paths:
+            kept.append(hedge['share_price'][:keep_paths - start])
+    return {
+        'n_ups': n_ups,
+        'terminal_price': prices[steps, n_ups],
+        'delta_hedged_P/L': pnl,
+        'share_price': np.concatenate(kept) if kept else np.empty((0, steps + 1)),
+    }
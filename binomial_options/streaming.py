@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Constant-memory summaries of the delta-hedge simulation.
+
+Paths are simulated in chunks and only their terminal results are kept long
+enough to fold into running statistics, so memory is O(chunk_size * steps)
+however many paths are run.
+"""
+
+import numpy as np
+
+from binomial_options.lattice import terminal_distribution
+from binomial_options.simulate import simulate_delta_hedge
+
+
+def iter_hedge_results(n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, rng=None, chunk_size=100_000,
+                       rebalance_band=0.0, backend='auto'):
+    """
+    Yield the terminal result of every path, chunk_size paths at a time.
+
+    Each chunk is a dict of 1-D arrays: n_ups, terminal_price and
+    delta_hedged_P/L. Chunks consume one random stream in order, so for a given
+    seed the paths are the same as a single simulate_delta_hedge call.
+    """
+    rng = np.random.default_rng(rng)
+    for start in range(0, n_paths, chunk_size):
+        hedge = simulate_delta_hedge(min(chunk_size, n_paths - start), steps, start_price, strike, callput,
+                                     up_probability, up_return, option_position, rng, rebalance_band, backend)
+        yield {
+            'n_ups': hedge['n_ups'][:, -1],
+            'terminal_price': hedge['share_price'][:, -1],
+            'delta_hedged_P/L': hedge['cumulative_portfolio_P/L'][:, -1],
+        }
+
+
+def _merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    # Chan et al. pairwise update of Welford's running mean and sum of squared deviations
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(count > 0, count_b / np.maximum(count, 1), 0.0)
+    mean = mean_a + delta * weight
+    m2 = m2_a + m2_b + delta**2 * count_a * weight
+    return count, mean, m2
+
+
+class HedgeStatistics:
+    """
+    Running summary of terminal hedged P/L, overall and per terminal node.
+
+    Tracks Welford mean/variance, the exact total, terminal-node frequencies
+    and, when pnl_bins (histogram edges) are given, a P/L histogram for each
+    terminal price. P/L is rounded to whole dollars first, as in the
+    simulation tables.
+    """
+
+    def __init__(self, steps, start_price, up_probability, up_return, pnl_bins=None):
+        self.steps = steps
+        self.start_price = start_price
+        self.up_probability = up_probability
+        self.up_return = up_return
+
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.node_count = np.zeros(steps + 1, dtype=np.int64)
+        self.node_mean = np.zeros(steps + 1)
+        self.node_m2 = np.zeros(steps + 1)
+
+        self.pnl_bins = None if pnl_bins is None else np.asarray(pnl_bins, dtype=float)
+        if self.pnl_bins is not None:
+            self.histogram = np.zeros((steps + 1, len(self.pnl_bins) - 1), dtype=np.int64)
+
+    def update(self, n_ups, pnl):
+        """Fold in one chunk of paths given their terminal up counts and P/L."""
+        n_ups = np.asarray(n_ups)
+        pnl = np.round(np.asarray(pnl, dtype=float), 0)
+        if not len(pnl):
+            return
+
+        chunk_mean = pnl.mean()
+        self.count, self.mean, self.m2 = _merge_moments(self.count, self.mean, self.m2,
+                                                        len(pnl), chunk_mean, ((pnl - chunk_mean)**2).sum())
+        self.total += pnl.sum()
+
+        node_count = np.bincount(n_ups, minlength=self.steps + 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            node_mean = np.where(node_count > 0, np.bincount(n_ups, pnl, self.steps + 1) / node_count, 0.0)
+        node_m2 = np.bincount(n_ups, (pnl - node_mean[n_ups])**2, self.steps + 1)
+        self.node_count, self.node_mean, self.node_m2 = _merge_moments(self.node_count, self.node_mean, self.node_m2,
+                                                                       node_count, node_mean, node_m2)
+
+        if self.pnl_bins is not None:
+            bin_index = np.searchsorted(self.pnl_bins, pnl, side='right') - 1
+            in_range = (bin_index >= 0) & (bin_index < self.histogram.shape[1])
+            np.add.at(self.histogram, (n_ups[in_range], bin_index[in_range]), 1)
+
+    def merge(self, other):
+        """Combine with statistics gathered separately, e.g. in another process."""
+        self.count, self.mean, self.m2 = _merge_moments(self.count, self.mean, self.m2, other.count, other.mean, other.m2)
+        self.total += other.total
+        self.node_count, self.node_mean, self.node_m2 = _merge_moments(self.node_count, self.node_mean, self.node_m2,
+                                                                       other.node_count, other.node_mean, other.node_m2)
+        if self.pnl_bins is not None:
+            self.histogram += other.histogram
+
+    @property
+    def st_dev(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def set_summary(self, sim_number):
+        """One sets_of_sims_table row."""
+        return {'sim_number': sim_number, 'mean_P/L': float(self.mean), 'sim_total_P/L': float(self.total), 'st_dev': float(self.st_dev)}
+
+    def terminal_prices(self):
+        prices, _ = terminal_distribution(self.start_price, self.steps, self.up_probability, self.up_return)
+        return prices
+
+    def theo_vs_actual(self, decimals=2):
+        """The script's merged_df: theoretical vs simulated frequency of each terminal price."""
+        import pandas as pd
+
+        prices, probabilities = terminal_distribution(self.start_price, self.steps, self.up_probability, self.up_return)
+        actual = np.where(self.node_count > 0, self.node_count / max(self.count, 1), np.nan)
+        merged_df = pd.DataFrame({
+            'terminal_price': prices.round(decimals),
+            'theo_frequency': probabilities.round(4),
+            'actual_frequency': actual.round(4),
+        })
+        merged_df['actual-theo'] = merged_df['actual_frequency'] - merged_df['theo_frequency']
+        return merged_df
+
+    def pnl_by_terminal_price(self, decimals=2):
+        """Count, mean and std of hedged P/L for each terminal price that was reached."""
+        import pandas as pd
+
+        reached = self.node_count > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.where(self.node_count > 1, np.sqrt(self.node_m2 / (self.node_count - 1)), np.nan)
+        return pd.DataFrame({
+            'terminal_price': self.terminal_prices().round(decimals)[reached],
+            'count': self.node_count[reached],
+            'mean_P/L': self.node_mean[reached],
+            'std_P/L': std[reached],
+        })
+
+
+def stream_sets(sets_of_sims, n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, seed=None, chunk_size=100_000, pnl_bins=None,
+                rebalance_band=0.0, backend='auto'):
+    """
+    Run every set in streaming mode.
+
+    Returns (sets_of_sims_table, merged_df, statistics), where statistics is the
+    HedgeStatistics over all sets combined. Set j draws from child j of the master
+    SeedSequence, the same streams run_sets_parallel uses.
+    """
+    import pandas as pd
+
+    overall = HedgeStatistics(steps, start_price, up_probability, up_return, pnl_bins)
+    rows = []
+    for j, set_seed in enumerate(np.random.SeedSequence(seed).spawn(sets_of_sims)):
+        statistics = HedgeStatistics(steps, start_price, up_probability, up_return, pnl_bins)
+        for chunk in iter_hedge_results(n_paths, steps, start_price, strike, callput, up_probability, up_return,
+                                        option_position, set_seed, chunk_size, rebalance_band, backend):
+            statistics.update(chunk['n_ups'], chunk['delta_hedged_P/L'])
+        rows.append(statistics.set_summary(j + 1))
+        overall.merge(statistics)
+
+    return pd.DataFrame(rows), overall.theo_vs_actual(), overall
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+The delta-hedge study from "binomial stock process options.py", as functions.
+
+run_study does the simulation and returns the result tables; the report and
+plot helpers print and chart them. pandas, matplotlib and seaborn are only
+imported when a function that needs them is called.
+"""
+
+import time
+
+import numpy as np
+
+from binomial_options.lattice import cached_node_table, theo_binomial_distribution
+from binomial_options.recorder import ResultRecorder
+from binomial_options.simulate import simulate_delta_hedge
+
+PATH_COLUMNS = {
+    'sim_number': 'int64',
+    'trial': 'int64',
+    'current_step': 'int64',
+    'strike': 'float64',
+    'option_position': 'int64',
+    'callput': 'U1',
+    'share_price': 'float64',
+    'cumulative_portfolio_P/L': 'float64',
+}
+SIMULATION_COLUMNS = {
+    'sim_number': 'int64',
+    'trial': 'int64',
+    'option_position': 'int64',
+    'strike': 'float64',
+    'terminal_price': 'float64',
+    'stock_return': 'float64',
+    'delta_hedged_P/L': 'float64',
+}
+SET_COLUMNS = {
+    'sim_number': 'int64',
+    'mean_P/L': 'float64',
+    'sim_total_P/L': 'float64',
+    'st_dev': 'float64',
+}
+
+
+def run_study(num_of_simulations, sets_of_sims, steps, start_price, strike, callput, up_probability, up_return, option_position=1, seed=None, memory_budget=None,
+              rebalance_band=0.0, backend='auto'):
+    """
+    Simulate sets_of_sims sets of num_of_simulations hedged paths.
+
+    Returns (path_table, simulation_table, sets_of_sims_table). memory_budget is
+    passed to the path table's ResultRecorder, which spills to Parquet past it.
+    Set j draws from child j of the master SeedSequence, the same streams
+    stream_sets and run_sets_parallel use, so every mode agrees for a seed.
+    """
+    set_seeds = np.random.SeedSequence(seed).spawn(sets_of_sims)
+    steps_per_path = steps + 1
+
+    # Preallocated result stores, turned into DataFrames once after the loop
+    path_recorder = ResultRecorder(PATH_COLUMNS, sets_of_sims*num_of_simulations*steps_per_path, memory_budget=memory_budget)
+    simulation_recorder = ResultRecorder(SIMULATION_COLUMNS, sets_of_sims*num_of_simulations)
+    sets_of_sims_recorder = ResultRecorder(SET_COLUMNS, sets_of_sims)
+
+    for j in range(sets_of_sims):
+        hedge = simulate_delta_hedge(num_of_simulations, steps, start_price, strike, callput, up_probability, up_return, option_position,
+                                     set_seeds[j], rebalance_band, backend)
+
+        #record every trial path, one row per step
+        path_recorder.append({
+            'sim_number': j+1,
+            'trial': np.repeat(np.arange(1, num_of_simulations+1), steps_per_path),
+            'current_step': np.tile(np.arange(steps_per_path), num_of_simulations),
+            'strike': strike,
+            'option_position': option_position,
+            'callput': callput,
+            'share_price': hedge['share_price'].round(3),
+            'cumulative_portfolio_P/L': hedge['cumulative_portfolio_P/L'].round(0),
+        })
+
+        #Simulation Data Table
+        terminal_price = hedge['share_price'][:, -1]
+        terminal_pnl = hedge['cumulative_portfolio_P/L'][:, -1].round(0)
+        simulation_recorder.append({
+            'sim_number': j+1,
+            'trial': np.arange(1, num_of_simulations+1),
+            'option_position': option_position,
+            'strike': strike,
+            'terminal_price': terminal_price.round(2),
+            'stock_return': (terminal_price/start_price - 1).round(3),
+            'delta_hedged_P/L': terminal_pnl,
+        })
+
+        sets_of_sims_recorder.append({
+            'sim_number': j + 1,
+            'mean_P/L': terminal_pnl.mean(),
+            'sim_total_P/L': terminal_pnl.sum(),
+            'st_dev': terminal_pnl.std(ddof=1),
+        })
+
+    return path_recorder.to_frame(), simulation_recorder.to_frame(), sets_of_sims_recorder.to_frame()
+
+
+def theo_vs_actual(simulation_table, steps, start_price, up_probability, up_return, decimals=2):
+    """merged_df: theoretical vs simulated frequency of every terminal price."""
+    import pandas as pd
+
+    #theoretical distribution
+    distribution = theo_binomial_distribution(steps, up_return, up_probability, start_price)
+    distro_df = pd.DataFrame(distribution, columns=['terminal_price', 'theo_frequency'])
+    distro_df['theo_frequency'] = distro_df['theo_frequency'].round(4)
+
+    #actual distribution
+    terminal_price_proportions = simulation_table['terminal_price'].value_counts(normalize=True)
+    terminal_price_proportions = terminal_price_proportions.reset_index()
+    terminal_price_proportions.columns = ['terminal_price', 'actual_frequency']
+    terminal_price_proportions.sort_values(by='terminal_price', inplace=True)
+    terminal_price_proportions['actual_frequency'] = terminal_price_proportions['actual_frequency'].round(4)
+
+    #merging the table
+    distro_df['terminal_price'] = distro_df['terminal_price'].round(decimals)
+    terminal_price_proportions['terminal_price'] = terminal_price_proportions['terminal_price'].round(decimals)
+
+    merged_df = distro_df.merge(terminal_price_proportions, on='terminal_price', how='left')
+    merged_df['actual-theo'] = merged_df['actual_frequency']-merged_df['theo_frequency']
+    return merged_df
+
+
+def print_set_summary(set_row, initial_option_price):
+    print('Simulation_number:', int(set_row['sim_number']))
+
+    print("Total_profit_for_all_simulations:", round(set_row['sim_total_P/L'],1))
+    print("Mean_profit_for_all_simulations:", round(set_row['mean_P/L'],1))
+    print("St_dev_for_all_simulations:", round(set_row['st_dev'],0))
+    print("st_dev_scaled_to_initial_option_premium:", round(.01*round(set_row['st_dev'],0)/initial_option_price,3))
+    print("")
+
+
+def plot_set(set_simulations):
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mticker
+    import seaborn as sns
+
+    fig1, ax1 = plt.subplots(2, 1, figsize=(10, 10))
+
+    # Plot 1: Histogram of Terminal Prices
+    sns.histplot(set_simulations['terminal_price'], kde=True, ax=ax1[0], stat="percent")
+    ax1[0].set_title('Distribution of Terminal Prices')
+    ax1[0].set_xlabel('Terminal Price')
+    ax1[0].set_ylabel('Percentage')
+    ax1[0].yaxis.set_major_formatter(mticker.FuncFormatter(lambda y, _: '{:.0f}%'.format(y)))
+
+    # Plot 2: Scatter plot between Terminal Prices and Delta Hedged P/L
+    sns.barplot(x='terminal_price', y='delta_hedged_P/L', data=set_simulations, ax=ax1[1])
+    ax1[1].set_title('Scatter plot between Terminal Prices and Delta Hedged P/L')
+    ax1[1].set_xlabel('Terminal Price')
+    ax1[1].set_ylabel('Delta Hedged P/L')
+
+    plt.tight_layout()
+    plt.show()
+
+
+def plot_paths(path_table):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+
+    # Plot each share price path
+    for (sim, trial), group in path_table.groupby(['sim_number', 'trial']):
+        ax.plot(group['current_step'], group['share_price'], label=f"Sim {sim} Trial {trial}")
+
+    ax.set_title('Share Price Path for Each Simulation and Trial')
+    ax.set_xlabel('Step')
+    ax.set_ylabel('Share Price')
+
+    plt.tight_layout()
+    plt.show()
+
+
+def plot_frequencies(merged_df):
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mticker
+    import seaborn as sns
+
+    fig2, ax2 = plt.subplots(2, 1, figsize=(10, 10))
+
+    # Plot 3: Bar chart of Actual and Theoretical Frequencies
+    position = list(range(len(merged_df['terminal_price'])))
+    width = 0.4
+    ax2[0].bar(position, merged_df['actual_frequency'], width=width, label='Actual Frequency', color='blue', edgecolor='gray')
+    ax2[0].bar([p + width for p in position], merged_df['theo_frequency'], width=width, label='Theoretical Frequency', color='black', edgecolor='gray')
+    ax2[0].set_xticks([p + 0.5 * width for p in position])
+    ax2[0].set_xticklabels(merged_df['terminal_price'].values, rotation=45, ha='right')
+    ax2[0].set_title('Comparison of Actual and Theoretical Frequencies for each Terminal Price')
+    ax2[0].set_xlabel('Terminal Price')
+    ax2[0].set_ylabel('Frequency')
+    ax2[0].legend(['Actual Frequency', 'Theoretical Frequency'], loc='upper left')
+    ax2[0].grid(axis='y')
+    ax2[0].yaxis.set_major_formatter(mticker.PercentFormatter(1.0, decimals=0))
+
+    # Plot 4: Difference between Actual and Theoretical Frequencies
+    sns.barplot(x='terminal_price', y='actual-theo', data=merged_df, ax=ax2[1], color='blue', edgecolor='black')
+    ax2[1].set_title('Difference between Actual and Theoretical Frequencies')
+    ax2[1].set_xlabel('Terminal Price')
+    ax2[1].set_ylabel('Actual - Theoretical (%)')
+    ax2[1].grid(axis='y')
+    ax2[1].yaxis.set_major_formatter(mticker.PercentFormatter(1.0, decimals=2))
+
+    plt.tight_layout()
+    plt.show()
+
+
+def print_study_summary(num_of_simulations, sets_of_sims_table, mean_stock_return, modal_stock_return):
+    print("")
+    print("Summary of all simulations")
+    print("")
+    print("Sims per set:", num_of_simulations)
+    print("Total sets:", len(sets_of_sims_table))
+    print("")
+    print("Mean profit across all sets of sims:", round(sets_of_sims_table['mean_P/L'].mean(),1))
+    print("Standard Dev of profit across all sets of sims:", round(sets_of_sims_table['sim_total_P/L'].std(),1))
+    print("")
+    print("Mean_stock_return:", round(mean_stock_return,3))
+    print("Modal_stock_return:", round(modal_stock_return,3))
+
+
+def run_and_report(num_of_simulations, sets_of_sims, steps, start_price, strike, callput, up_probability, up_return, option_position=1,
+                   seed=None, memory_budget=None, streaming=False, chunk_size=100_000, plots=True, rebalance_band=0.0, backend='auto'):
+    """
+    Run the study and print (and, with plots, chart) the results the way the script always has.
+
+    streaming=True keeps only running statistics, so memory stays flat in the
+    path count; the per-path tables and path chart are skipped.
+    """
+    initial_option_price = cached_node_table(start_price, steps, strike, callput, up_probability, up_return)[1][0, 0]
+
+    if streaming:
+        from binomial_options.streaming import stream_sets
+
+        start_time = time.time()
+        sets_of_sims_table, merged_df, statistics = stream_sets(sets_of_sims, num_of_simulations, steps, start_price, strike, callput,
+                                                                up_probability, up_return, option_position, seed, chunk_size,
+                                                                rebalance_band=rebalance_band, backend=backend)
+        elapsed_time = round(time.time() - start_time, 2)
+        for _, set_row in sets_of_sims_table.iterrows():
+            print_set_summary(set_row, initial_option_price)
+        stock_returns = statistics.terminal_prices() / start_price - 1
+        mean_stock_return = (statistics.node_count * stock_returns).sum() / statistics.count
+        modal_stock_return = stock_returns[statistics.node_count.argmax()]
+    else:
+        start_time = time.time()
+        path_table, simulation_table, sets_of_sims_table = run_study(num_of_simulations, sets_of_sims, steps, start_price, strike, callput,
+                                                                     up_probability, up_return, option_position, seed, memory_budget,
+                                                                     rebalance_band, backend)
+        elapsed_time = round(time.time() - start_time, 2)
+        for _, set_row in sets_of_sims_table.iterrows():
+            print_set_summary(set_row, initial_option_price)
+            if plots:
+                plot_set(simulation_table[simulation_table['sim_number'] == set_row['sim_number']])
+        if plots:
+            plot_paths(path_table)
+        merged_df = theo_vs_actual(simulation_table, steps, start_price, up_probability, up_return)
+        mean_stock_return = simulation_table['stock_return'].mean()
+        modal_stock_return = simulation_table['stock_return'].mode().iloc[0]
+
+    print_study_summary(num_of_simulations, sets_of_sims_table, mean_stock_return, modal_stock_return)
+    print("")
+    print(merged_df)
+    print("")
+    print(f"The simulation took {elapsed_time} seconds to run.")
+
+    if plots:
+        plot_frequencies(merged_df)
+
+    return sets_of_sims_table, merged_df
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Hedge-policy sweeps with common random numbers.
+
+One matrix of uniform draws is made per sweep and every grid point hedges the
+same up/down sequences, so differences between grid points come from the
+policy and contract, not from sampling noise. Grid points that share a strike
+and up_return share one node table.
+"""
+
+import itertools
+
+import numpy as np
+
+from binomial_options.kernels import hedge_paths
+from binomial_options.lattice import cached_node_table
+
+SWEEP_PARAMETERS = ('strike', 'up_return', 'rebalance_every', 'rebalance_band', 'cost_per_share')
+
+
+def sweep_hedges(grid, n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, rng=None, backend='auto'):
+    """
+    Hedge the same n_paths paths under every combination of the grid's values.
+
+    grid maps any of SWEEP_PARAMETERS to a list of values: strike, up_return
+    (which sets the vol), rebalance_every (steps between rehedges),
+    rebalance_band (in delta) and cost_per_share. Parameters left out keep the
+    value passed here, or rehedge every step at no cost. Returns a tidy
+    DataFrame with one row per grid point: its parameters, the initial option
+    price and the mean and st dev of the terminal hedged P/L (unrounded, net of
+    costs), the mean trading cost and the mean number of rehedges before expiry.
+    """
+    import pandas as pd
+
+    unknown = set(grid) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"cannot sweep {sorted(unknown)}; choose from {SWEEP_PARAMETERS}")
+    base = {'strike': strike, 'up_return': up_return, 'rebalance_every': 1, 'rebalance_band': 0.0, 'cost_per_share': 0.0}
+    values = [list(grid.get(name, [base[name]])) for name in SWEEP_PARAMETERS]
+
+    uniforms = np.random.default_rng(rng).random((n_paths, steps))
+
+    rows = []
+    # strike and up_return vary slowest, so each node table is built once and reused for its policies
+    for point in itertools.product(*values):
+        parameters = dict(zip(SWEEP_PARAMETERS, point))
+        prices, option_values, deltas = cached_node_table(start_price, steps, parameters['strike'], callput, up_probability, parameters['up_return'])
+        hedge = hedge_paths(uniforms, up_probability, prices, option_values, deltas, option_position,
+                            parameters['rebalance_band'] * 100 * abs(option_position), parameters['rebalance_every'],
+                            parameters['cost_per_share'], backend)
+
+        terminal_pnl = hedge['cumulative_portfolio_P/L'][:, -1]
+        rehedges = (np.diff(hedge['share_position'][:, :-1], axis=1) != 0).sum(axis=1)
+        rows.append({
+            **parameters,
+            'initial_option_price': option_values[0, 0],
+            'mean_P/L': terminal_pnl.mean(),
+            'st_dev': terminal_pnl.std(ddof=1),
+            'st_dev_scaled_to_initial_option_premium': .01 * terminal_pnl.std(ddof=1) / option_values[0, 0],
+            'mean_trading_cost': hedge['cumulative_trading_cost'][:, -1].mean(),
+            'mean_rehedges': rehedges.mean(),
+        })
+
+    return pd.DataFrame(rows)
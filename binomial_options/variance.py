@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Variance-reduced estimates of the mean terminal hedged P/L.
+
+Every method hedges its paths with the same kernels as simulate_delta_hedge
+and reports its standard error together with the effective sample size: how
+many plain Monte Carlo paths would give the same standard error.
+"""
+
+import numpy as np
+
+from binomial_options.kernels import hedge_paths
+from binomial_options.lattice import cached_node_table, option_payoff, terminal_distribution
+
+METHODS = ('plain', 'antithetic', 'stratified', 'control_variate')
+
+
+def _summary(method, n_paths, mean, st_error, path_variance):
+    # path_variance is the variance of one plain path's P/L, so plain Monte Carlo needs path_variance / st_error**2 paths;
+    # a st_error this far below the path st dev is rounding noise (stratifying on the terminal node of a
+    # hedge with no path dependence leaves none), so the gain is reported as unbounded rather than ~1e28
+    ess = path_variance / st_error**2 if st_error > 1e-9 * np.sqrt(path_variance) else np.inf
+    return {
+        'method': method,
+        'n_paths': n_paths,
+        'mean_P/L': mean,
+        'st_error': st_error,
+        'st_dev': np.sqrt(path_variance),
+        'ess': ess,
+        'ess_gain': ess / n_paths,
+    }
+
+
+def _stratified_uniforms(n_ups, steps, rng):
+    # given its up count, every ordering of a path's moves is equally likely, so rank
+    # random keys and make the n_ups smallest the up moves (uniform 0 is always an up)
+    ranks = rng.random((len(n_ups), steps)).argsort(axis=1).argsort(axis=1)
+    return (ranks >= n_ups[:, np.newaxis]).astype(float)
+
+
+def stratified_allocation(n_paths, weights, min_per_stratum=2):
+    """Paths per stratum: proportional to weights by largest remainder, and at least min_per_stratum each."""
+    ideal = n_paths * np.asarray(weights)
+    counts = np.floor(ideal).astype(np.int64)
+    counts[np.argsort(counts - ideal)[:n_paths - counts.sum()]] += 1
+    return np.maximum(counts, min_per_stratum)
+
+
+def estimate_mean_pnl(n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, method='plain', rng=None,
+                      backend='auto'):
+    """
+    Estimate the mean terminal hedged P/L (unrounded) with one of METHODS.
+
+    antithetic pairs every path's uniforms u with 1 - u. stratified fixes how
+    many paths end at each terminal node, in proportion to its exact binomial
+    weight (at least 2 per node, so a few extra paths may be run), and
+    reweights the node means. control_variate regresses the P/L on the
+    unhedged option payoff, whose mean is known exactly. Returns a dict with
+    the estimate, its standard error, the per-path st dev and the effective
+    sample size and its ratio to the paths used.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, not {method!r}")
+    rng = np.random.default_rng(rng)
+    tables = cached_node_table(start_price, steps, strike, callput, up_probability, up_return)
+
+    def terminal_pnl(uniforms):
+        return hedge_paths(uniforms, up_probability, *tables, option_position, backend=backend)['cumulative_portfolio_P/L'][:, -1]
+
+    if method == 'antithetic':
+        uniforms = rng.random((n_paths // 2, steps))
+        pnl, antithetic_pnl = terminal_pnl(uniforms), terminal_pnl(1 - uniforms)
+        pair_mean = (pnl + antithetic_pnl) / 2
+        path_variance = np.concatenate([pnl, antithetic_pnl]).var(ddof=1)
+        return _summary(method, 2 * len(pair_mean), pair_mean.mean(), pair_mean.std(ddof=1) / np.sqrt(len(pair_mean)), path_variance)
+
+    if method == 'stratified':
+        _, weights = terminal_distribution(start_price, steps, up_probability, up_return)
+        counts = stratified_allocation(n_paths, weights)
+        n_ups = np.repeat(np.arange(steps + 1), counts)
+        pnl = terminal_pnl(_stratified_uniforms(n_ups, steps, rng))
+        node_mean = np.bincount(n_ups, pnl) / counts
+        node_variance = np.bincount(n_ups, (pnl - node_mean[n_ups])**2) / (counts - 1)
+        mean = weights @ node_mean
+        # the plain path variance is the within-node variance plus the spread of the node means
+        path_variance = weights @ (node_variance + (node_mean - mean)**2)
+        return _summary(method, counts.sum(), mean, np.sqrt(weights**2 @ (node_variance / counts)), path_variance)
+
+    uniforms = rng.random((n_paths, steps))
+    hedge = hedge_paths(uniforms, up_probability, *tables, option_position, backend=backend)
+    pnl = hedge['cumulative_portfolio_P/L'][:, -1]
+    if method == 'plain':
+        return _summary(method, n_paths, pnl.mean(), pnl.std(ddof=1) / np.sqrt(n_paths), pnl.var(ddof=1))
+
+    prices, weights = terminal_distribution(start_price, steps, up_probability, up_return)
+    payoff = 100 * option_position * option_payoff(hedge['share_price'][:, -1], strike, callput)
+    payoff_mean = 100 * option_position * (weights @ option_payoff(prices, strike, callput))
+    covariance = np.cov(pnl, payoff)
+    beta = covariance[0, 1] / covariance[1, 1] if covariance[1, 1] > 0 else 0.0
+    adjusted = pnl - beta * (payoff - payoff_mean)
+    return _summary(method, n_paths, adjusted.mean(), adjusted.std(ddof=1) / np.sqrt(n_paths), pnl.var(ddof=1))
+
+
+def compare_methods(n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position=1, seed=None, backend='auto'):
+    """One estimate_mean_pnl row per method, each from its own child of the seed, as a DataFrame."""
+    import pandas as pd
+
+    seeds = np.random.SeedSequence(seed).spawn(len(METHODS))
+    return pd.DataFrame([estimate_mean_pnl(n_paths, steps, start_price, strike, callput, up_probability, up_return, option_position,
+                                           method, method_seed, backend)
+                         for method, method_seed in zip(METHODS, seeds)])
@@ -0,0 +1,2 @@
+from compounded_returns.wealth import fill_wealth, iter_wealth_paths, simulate_terminal_wealth, theo_vs_sample, theoretical_wealth
+from compounded_returns.streaming import LogBucketQuantiles, WealthStatistics, stream_wealth
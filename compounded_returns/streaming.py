@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Memory-bounded summaries of the compounded-returns simulation.
+
+Paths are simulated into buffers sized to a memory budget and reused for every
+chunk, then folded into exact running mean/variance per year and a
+log-bucket quantile sketch per year. Memory does not grow with the number of
+simulations.
+"""
+
+import numpy as np
+
+from compounded_returns.wealth import fill_wealth, theoretical_wealth
+
+FAN_QUANTILES = (.05, .25, .5, .75, .95)
+
+
+def _merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    # Chan et al. pairwise update of Welford's running mean and sum of squared deviations
+    count = count_a + count_b
+    weight = count_b / count if count else 0.0
+    delta = mean_b - mean_a
+    return count, mean_a + delta * weight, m2_a + m2_b + delta**2 * count_a * weight
+
+
+class LogBucketQuantiles:
+    """
+    Streaming quantile sketch for n_series positive series at once.
+
+    Values are counted in logarithmic buckets (as in DDSketch), so any
+    quantile comes back within relative_accuracy of a value in the data, and
+    sketches of separate runs merge by adding counts. Values outside
+    [min_value, max_value], including wealth that went to zero or below, are
+    counted in the end buckets.
+    """
+
+    def __init__(self, n_series, relative_accuracy=.005, min_value=1e-3, max_value=1e15):
+        self.n_series = n_series
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self._min_key = int(np.ceil(np.log(min_value) / self._log_gamma))
+        self._max_key = int(np.ceil(np.log(max_value) / self._log_gamma))
+        self.n_buckets = self._max_key - self._min_key + 1
+        self.min_value = min_value
+        self.counts = np.zeros((n_series, self.n_buckets), dtype=np.int64)
+
+    def update(self, values, scratch=None, keys=None):
+        """
+        Count a (rows, n_series) block of values.
+
+        scratch (same shape and dtype as values) and keys (same shape, intp)
+        are optional work buffers, reused so a chunk allocates nothing.
+        """
+        scratch = np.empty_like(values) if scratch is None else scratch[:len(values)]
+        keys = np.empty(values.shape, dtype=np.intp) if keys is None else keys[:len(values)]
+
+        # key = ceil(log_gamma(value)), so the bucket covers (gamma**(key-1), gamma**key]
+        np.maximum(values, self.min_value, out=scratch)
+        np.log(scratch, out=scratch)
+        scratch /= self._log_gamma
+        np.ceil(scratch, out=scratch)
+        np.clip(scratch, self._min_key, self._max_key, out=scratch)
+        np.copyto(keys, scratch, casting='unsafe')
+        keys += np.arange(self.n_series) * self.n_buckets - self._min_key
+
+        self.counts += np.bincount(keys.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    def quantiles(self, qs):
+        """(len(qs), n_series) array of estimated quantiles."""
+        cumulative = self.counts.cumsum(axis=1)
+        ranks = np.multiply.outer(np.asarray(qs, dtype=float), cumulative[:, -1] - 1)
+        buckets = (cumulative[np.newaxis] <= ranks[..., np.newaxis]).sum(axis=2)
+        keys = np.minimum(buckets, self.n_buckets - 1) + self._min_key
+        # the point of the bucket with the smallest worst-case relative error
+        return 2 * self.gamma**keys / (self.gamma + 1)
+
+
+class WealthStatistics:
+    """
+    Running statistics of wealth at the end of every year.
+
+    Mean and variance are exact (accumulated in float64 whatever the path
+    dtype); quantiles come from a LogBucketQuantiles sketch.
+    """
+
+    def __init__(self, num_of_years, relative_accuracy=.005):
+        self.num_of_years = num_of_years
+        self.count = 0
+        self.mean = np.zeros(num_of_years)
+        self.m2 = np.zeros(num_of_years)
+        self.sketch = LogBucketQuantiles(num_of_years, relative_accuracy)
+
+    def update(self, wealth, scratch=None, keys=None):
+        """Fold in a (paths, num_of_years) block of wealth paths."""
+        if not len(wealth):
+            return
+        scratch = np.empty_like(wealth) if scratch is None else scratch[:len(wealth)]
+
+        chunk_mean = wealth.sum(axis=0, dtype=np.float64) / len(wealth)
+        np.subtract(wealth, chunk_mean.astype(wealth.dtype), out=scratch)
+        scratch *= scratch
+        chunk_m2 = scratch.sum(axis=0, dtype=np.float64)
+        self.count, self.mean, self.m2 = _merge_moments(self.count, self.mean, self.m2, len(wealth), chunk_mean, chunk_m2)
+
+        self.sketch.update(wealth, scratch, keys)
+
+    def merge(self, other):
+        self.count, self.mean, self.m2 = _merge_moments(self.count, self.mean, self.m2, other.count, other.mean, other.m2)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def st_dev(self):
+        """Population standard deviation per year, as np.std gives."""
+        return np.sqrt(self.m2 / self.count)
+
+    def fan(self, qs=FAN_QUANTILES):
+        """DataFrame of wealth quantiles by year, one column per quantile."""
+        import pandas as pd
+
+        return pd.DataFrame(self.sketch.quantiles(qs).T, index=pd.RangeIndex(1, self.num_of_years + 1, name='year'),
+                            columns=[f'q{round(100*q)}' for q in qs])
+
+    def theo_vs_sample(self, mean_return, vol, initial_bankroll=100):
+        """The script's theoretical and sample statistics of terminal wealth; the median is the sketch's."""
+        return {
+            **theoretical_wealth(self.num_of_years, mean_return, vol, initial_bankroll),
+            'mean': self.mean[-1],
+            'median': self.sketch.quantiles([.5])[0, -1],
+            'sample_st_dev_wealth': self.st_dev[-1],
+        }
+
+
+def chunk_size_for(memory_budget, num_of_years, dtype=np.float64):
+    """Paths per chunk whose wealth, scratch and bucket-key buffers fit in memory_budget bytes."""
+    path_bytes = num_of_years * (2 * np.dtype(dtype).itemsize + np.dtype(np.intp).itemsize)
+    return max(1, memory_budget // path_bytes)
+
+
+def stream_wealth(num_of_sims, num_of_years, mean_return, vol, initial_bankroll=100, rng=None, memory_budget=256 * 2**20,
+                  dtype=np.float64, relative_accuracy=.005, sample_paths=100):
+    """
+    Simulate num_of_sims paths in chunks whose buffers fit in memory_budget bytes.
+
+    Returns (statistics, sample): the WealthStatistics and the first
+    sample_paths whole paths. dtype=np.float32 halves the path buffers and
+    draws faster; for float64 the paths match iter_wealth_paths for the same
+    seed.
+    """
+    rng = np.random.default_rng(rng)
+    chunk_size = min(num_of_sims, chunk_size_for(memory_budget, num_of_years, dtype))
+    wealth_buffer = np.empty((chunk_size, num_of_years), dtype)
+    scratch = np.empty_like(wealth_buffer)
+    keys = np.empty(wealth_buffer.shape, dtype=np.intp)
+
+    statistics = WealthStatistics(num_of_years, relative_accuracy)
+    sample = np.empty((min(sample_paths, num_of_sims), num_of_years), dtype)
+    for start in range(0, num_of_sims, chunk_size):
+        wealth = fill_wealth(rng, wealth_buffer[:min(chunk_size, num_of_sims - start)], mean_return, vol, initial_bankroll)
+        if start < len(sample):
+            sample[start:start + len(wealth)] = wealth[:len(sample) - start]
+        statistics.update(wealth, scratch, keys)
+
+    return statistics, sample
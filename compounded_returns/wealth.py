@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized Monte Carlo of wealth compounded from normal annual returns.
+
+Each chunk draws a (paths x years) matrix of returns and compounds it with
+cumprod along the years, so there is no Python loop per simulation. Only the
+terminal wealth of every path and a bounded sample of whole paths are kept.
+"""
+
+import time
+
+import numpy as np
+
+
+def fill_wealth(rng, out, mean_return, vol, initial_bankroll=100):
+    """Draw a block of wealth paths into out, a (paths, num_of_years) float array, and return it."""
+    # scaling standard normals in place skips the temporaries rng.normal makes
+    rng.standard_normal(out=out, dtype=out.dtype)
+    out *= vol
+    out += 1 + mean_return
+    np.cumprod(out, axis=1, out=out)
+    out *= initial_bankroll
+    return out
+
+
+def iter_wealth_paths(num_of_sims, num_of_years, mean_return, vol, initial_bankroll=100, rng=None, chunk_size=100_000):
+    """
+    Yield wealth paths chunk_size simulations at a time.
+
+    Each chunk is a (paths, num_of_years) array of wealth at the end of every
+    year. Chunks consume one random stream in order, so for a given seed the
+    paths do not depend on chunk_size.
+    """
+    rng = np.random.default_rng(rng)
+    for start in range(0, num_of_sims, chunk_size):
+        yield fill_wealth(rng, np.empty((min(chunk_size, num_of_sims - start), num_of_years)), mean_return, vol, initial_bankroll)
+
+
+def simulate_terminal_wealth(num_of_sims, num_of_years, mean_return, vol, initial_bankroll=100, rng=None, chunk_size=100_000, sample_paths=100):
+    """
+    Terminal wealth of every simulation, plus the first sample_paths whole paths.
+
+    Simulations are independent, so the first paths are as random a sample as
+    any. Returns (terminal_wealth, sample) with shapes (num_of_sims,) and
+    (min(sample_paths, num_of_sims), num_of_years).
+    """
+    terminal_wealth = np.empty(num_of_sims)
+    sample = np.empty((min(sample_paths, num_of_sims), num_of_years))
+
+    start = 0
+    for wealth in iter_wealth_paths(num_of_sims, num_of_years, mean_return, vol, initial_bankroll, rng, chunk_size):
+        terminal_wealth[start:start + len(wealth)] = wealth[:, -1]
+        if start < len(sample):
+            sample[start:start + len(wealth)] = wealth[:len(sample) - start]
+        start += len(wealth)
+    return terminal_wealth, sample
+
+
+def theoretical_wealth(num_of_years, mean_return, vol, initial_bankroll=100):
+    """The script's theoretical returns and terminal wealth statistics, as a dict."""
+    median_return = mean_return - .5*vol**2
+    theo_mean = initial_bankroll*(1+mean_return)**num_of_years
+    return {
+        'mean_return': mean_return,
+        'median_return': median_return,
+        'theo_mean': theo_mean,
+        'theo_median': initial_bankroll*(1+median_return)**num_of_years,
+        'theo_st_dev_wealth': vol * num_of_years**.5 * theo_mean,
+    }
+
+
+def theo_vs_sample(terminal_wealth, num_of_years, mean_return, vol, initial_bankroll=100):
+    """The script's theoretical and sample statistics of terminal wealth, as a dict."""
+    return {
+        **theoretical_wealth(num_of_years, mean_return, vol, initial_bankroll),
+        'mean': np.mean(terminal_wealth),
+        'median': np.median(terminal_wealth),
+        'sample_st_dev_wealth': np.std(terminal_wealth),
+    }
+
+
+def print_summary(summary):
+    print("annual theo mean return = "+ str(summary['mean_return']), ", annual theo median return = " + str(summary['median_return']))
+    print ("mean = " + str(summary['mean']), "theo mean = "+ str(summary['theo_mean']))
+    print("median = "+ str(summary['median']), "theo median = "+ str(summary['theo_median']))
+    print( "theo st dev wealth = " + str(summary['theo_st_dev_wealth']), "sample st dev wealth = " + str(summary['sample_st_dev_wealth']))
+
+
+def plot_paths(sample):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+
+    # a bounded sample keeps the number of line artists small
+    ax.plot(sample.T, linewidth=.5)
+    ax.set_title(f'Wealth paths ({len(sample)} sampled simulations)')
+    ax.set_xlabel('Year')
+    ax.set_ylabel('Wealth')
+
+    plt.tight_layout()
+    plt.show()
+
+
+def plot_fan(fan):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+
+    # shade the 5-95 and 25-75 bands around the median
+    ax.fill_between(fan.index, fan['q5'], fan['q95'], alpha=.2, color='blue', label='5th-95th percentile')
+    ax.fill_between(fan.index, fan['q25'], fan['q75'], alpha=.4, color='blue', label='25th-75th percentile')
+    ax.plot(fan.index, fan['q50'], color='black', label='Median')
+    ax.set_yscale('log')
+    ax.set_title('Wealth percentiles by year')
+    ax.set_xlabel('Year')
+    ax.set_ylabel('Wealth')
+    ax.legend(loc='upper left')
+
+    plt.tight_layout()
+    plt.show()
+
+
+def run_and_report(num_of_sims, num_of_years, mean_return, vol, initial_bankroll=100, seed=None, chunk_size=100_000, sample_paths=100, plots=True,
+                   streaming=False, memory_budget=256 * 2**20, dtype=np.float64):
+    """
+    Simulate, print the theo vs sample comparison and, with plots, chart the sampled paths.
+
+    streaming=True keeps running statistics instead of every terminal wealth,
+    sizing chunks to memory_budget bytes (chunk_size is then ignored); its
+    median comes from a quantile sketch and its chart is a percentile fan.
+    """
+    start_time = time.time()
+    if streaming:
+        from compounded_returns.streaming import stream_wealth
+
+        statistics, sample = stream_wealth(num_of_sims, num_of_years, mean_return, vol, initial_bankroll, seed, memory_budget, dtype,
+                                           sample_paths=sample_paths)
+        summary = statistics.theo_vs_sample(mean_return, vol, initial_bankroll)
+        result = statistics
+    else:
+        terminal_wealth, sample = simulate_terminal_wealth(num_of_sims, num_of_years, mean_return, vol, initial_bankroll, seed, chunk_size, sample_paths)
+        summary = theo_vs_sample(terminal_wealth, num_of_years, mean_return, vol, initial_bankroll)
+        result = terminal_wealth
+    elapsed_time = round(time.time() - start_time, 2)
+
+    print_summary(summary)
+    print(f"The simulation took {elapsed_time} seconds to run.")
+
+    if plots:
+        plot_paths(sample)
+        if streaming:
+            plot_fan(statistics.fan())
+
+    return result, summary
@@ -0,0 +1,2 @@
+from dice_rolls.exact import tally_distribution, tally_moments, trials_distribution, trials_moments
+from dice_rolls.simulate import simulate_plays
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Exact distributions for the snake eyes game.
+
+Two dice are rolled until they show a 2. The number of rolls is geometric
+with p = 1/36, and the tally (the sum of every roll before the 2) is a
+geometric compound sum, so both distributions follow directly instead of
+from simulation.
+"""
+
+import numpy as np
+
+# the 36 equally likely outcomes of two dice, as their sums; index 0 is snake eyes
+TWO_DICE = np.add.outer(np.arange(1, 7), np.arange(1, 7)).ravel().astype(np.int16)
+SNAKE_EYES_PROBABILITY = 1 / 36
+# chance of each sum on one roll, indexed by the sum (0 and 1 are impossible)
+ROLL_PROBABILITIES = np.bincount(TWO_DICE, minlength=13) / 36
+
+
+def trials_distribution(max_trials=200):
+    """(num_of_trials, probability) for 1..max_trials rolls; the rest of the mass is in the tail past max_trials."""
+    num_of_trials = np.arange(1, max_trials + 1)
+    return num_of_trials, SNAKE_EYES_PROBABILITY * (1 - SNAKE_EYES_PROBABILITY)**(num_of_trials - 1)
+
+
+def trials_moments():
+    """Mean and variance of the number of rolls."""
+    p = SNAKE_EYES_PROBABILITY
+    return 1 / p, (1 - p) / p**2
+
+
+def tally_distribution(max_tally=2000):
+    """
+    (tally, probability) for tallies 0..max_tally.
+
+    A play ends now with probability 1/36, or rolls s > 2 with probability
+    ROLL_PROBABILITIES[s] and carries on, so P(tally = t) is the renewal
+    recursion f(t) = sum over s of ROLL_PROBABILITIES[s] * f(t - s), f(0) = 1/36.
+    """
+    weights = ROLL_PROBABILITIES[:2:-1]  # sums 12 down to 3, to line up with f(t-12)..f(t-3)
+    probabilities = np.zeros(max_tally + 13)
+    probabilities[12] = SNAKE_EYES_PROBABILITY
+    for t in range(15, max_tally + 13):
+        probabilities[t] = weights @ probabilities[t - 12:t - 2]
+    return np.arange(max_tally + 1), probabilities[12:]
+
+
+def tally_moments():
+    """Mean and variance of the tally, from the compound-sum formulas."""
+    p = SNAKE_EYES_PROBABILITY
+    sums = np.arange(3, 13)
+    roll_mean = (sums * ROLL_PROBABILITIES[3:]).sum() / (1 - p)  # a roll given it is not snake eyes
+    roll_variance = (sums**2 * ROLL_PROBABILITIES[3:]).sum() / (1 - p) - roll_mean**2
+    rolls_mean, rolls_variance = (1 - p) / p, (1 - p) / p**2  # rolls before the 2
+    return rolls_mean * roll_mean, rolls_mean * roll_variance + rolls_variance * roll_mean**2
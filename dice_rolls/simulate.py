@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Batch simulation of snake eyes plays.
+
+Every unfinished play draws a block of rolls at once; argmax finds the first
+snake eyes in each block, and only plays that have not hit one yet draw
+another block.
+"""
+
+import numpy as np
+
+from dice_rolls.exact import TWO_DICE
+
+
+def simulate_plays(n_plays, rng=None, block_rolls=16, chunk_plays=1_000_000):
+    """
+    Simulate n_plays games, chunk_plays at a time.
+
+    Returns a dict of (n_plays,) arrays: tally (sum of the rolls before the
+    2), num_of_trials (rolls including the 2) and avg_roll (tally per roll
+    before the 2, 0 if the first roll was a 2), as the original one-roll-per-call
+    play in snake_eyes.py reported them.
+    """
+    rng = np.random.default_rng(rng)
+    tally = np.zeros(n_plays, dtype=np.int64)
+    num_of_trials = np.zeros(n_plays, dtype=np.int64)
+    before_column = np.arange(block_rolls)
+
+    for start in range(0, n_plays, chunk_plays):
+        active = np.arange(start, min(start + chunk_plays, n_plays))
+        while len(active):
+            # one draw of 0..35 per roll picks both dice; 0 is snake eyes
+            outcomes = rng.integers(0, 36, (len(active), block_rolls), dtype=np.int8)
+            is_snake_eyes = outcomes == 0
+            done = is_snake_eyes.any(axis=1)
+            first = np.where(done, is_snake_eyes.argmax(axis=1), block_rolls)
+
+            rolls = TWO_DICE[outcomes]
+            rolls[before_column >= first[:, np.newaxis]] = 0
+            tally[active] += rolls.sum(axis=1)
+            num_of_trials[active] += first + done
+            active = active[~done]
+
+    avg_roll = np.divide(tally, num_of_trials - 1, out=np.zeros(n_plays), where=num_of_trials > 1)
+    return {'tally': tally, 'num_of_trials': num_of_trials, 'avg_roll': avg_roll}
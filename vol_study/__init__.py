@@ -0,0 +1,3 @@
+from vol_study.panel import PANEL_COLUMNS, add_forward_vars, compute_panel
+from vol_study.realized import close_to_close_vol, garman_klass_vol, log_returns, parkinson_vol, zero_mean_vol
+from vol_study.prices import BatchedSource, CSVSource, PriceStore, YahooSource
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+The trend ratio / variance contribution ratio panel, for every ticker at once.
+
+Each ticker's closes (after dropna, so gaps close up as in the per-ticker
+loop) are laid out as one row of a (tickers x days) array, and every rolling
+measure is a reduction over a sliding-window view of that array. The windows
+are contiguous along the days axis, so the sums add the same numbers in the
+same order as np.sum over each window and the output matches the original
+loop exactly.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+PANEL_COLUMNS = ['ticker', 'date', 'rv20_daily', 'rv20_weekly', 'TR', 'vcr20']
+
+
+def _aligned_closes(prices, tickers):
+    # each ticker's non-missing closes moved to the start of its row, NaN after; positions map back to prices.index
+    values = prices[tickers].to_numpy(dtype=float).T
+    positions = np.argsort(np.isnan(values), axis=1, kind='stable')
+    return np.take_along_axis(values, positions, axis=1), positions
+
+
+def _block_measures(closes, window, weekly_freq, ann_daily, ann_weekly):
+    n_weekly = window // weekly_freq
+    with np.errstate(invalid='ignore', divide='ignore'):
+        squared = np.log(closes[:, 1:] / closes[:, :-1])**2
+
+        # row i of a ticker uses returns i-window..i-1 and closes i-window..i, for i up to the second-last return
+        daily_windows = sliding_window_view(squared, window, axis=1)[:, :-1]
+        sum_sq = daily_windows.sum(axis=-1)
+        max_sq = daily_windows.max(axis=-1)
+        rv_daily = np.sqrt(sum_sq / window) * np.sqrt(ann_daily) * 100
+
+        weekly_closes = sliding_window_view(closes, window + 1, axis=1)[:, :squared.shape[1] - window, :n_weekly * weekly_freq + 1:weekly_freq]
+        weekly_rets = np.log(weekly_closes[..., 1:] / weekly_closes[..., :-1])
+        # summed as 2-D rows, which numpy reduces in the same order as a 1-D np.sum
+        n_tickers, n_rows = weekly_rets.shape[:2]
+        weekly_sum_sq = (weekly_rets**2).reshape(n_tickers * n_rows, n_weekly).sum(axis=1).reshape(n_tickers, n_rows)
+        rv_weekly = np.sqrt(weekly_sum_sq / n_weekly) * np.sqrt(ann_weekly) * 100
+
+        tr = np.where(rv_daily > 0, rv_weekly / rv_daily, np.nan)
+        vcr = np.where(sum_sq > 0, max_sq / sum_sq * 100, np.nan)
+    return rv_daily, rv_weekly, tr, vcr
+
+
+def compute_panel(prices, window=20, weekly_freq=5, ann_daily=252, ann_weekly=52, block_size=256, dtype=np.float32):
+    """
+    Compute RV20_daily, RV20_weekly, TR, and VCR20 from close prices.
+
+    prices is a (dates x tickers) DataFrame of closes. Returns the long panel
+    the per-ticker loop built, row for row: one row per ticker and day, in
+    contiguous per-ticker blocks sorted by (ticker, date), tickers in column
+    order. ticker is a categorical with the tickers in that order and the
+    measures are stored as dtype; they are computed in float64, so
+    dtype=np.float64 gives the loop's values exactly. Tickers are processed
+    block_size at a time to bound the memory of the weekly-return windows.
+    """
+    lengths = prices.notna().sum()
+    for ticker in lengths.index[lengths < window + 1]:
+        print(f"  {ticker}: insufficient data, skipping")
+    tickers = list(lengths.index[lengths >= window + 1])
+
+    frames = []
+    for start in range(0, len(tickers), block_size):
+        block = tickers[start:start + block_size]
+        closes, positions = _aligned_closes(prices, block)
+        measures = _block_measures(closes, window, weekly_freq, ann_daily, ann_weekly)
+
+        # a ticker with L closes has rows i = window..L-2, labelled with the date of close i+1
+        rows = lengths[block].to_numpy() - 1 - window
+        keep = np.arange(measures[0].shape[1]) < rows[:, np.newaxis]
+        date_positions = positions[:, window + 1:window + 1 + keep.shape[1]]
+        frames.append(pd.DataFrame({
+            'ticker': pd.Categorical.from_codes(np.repeat(np.arange(start, start + len(block)), rows), tickers),
+            'date': prices.index[date_positions[keep]],
+            'rv20_daily': measures[0][keep].astype(dtype),
+            'rv20_weekly': measures[1][keep].astype(dtype),
+            'TR': measures[2][keep].astype(dtype),
+            'vcr20': measures[3][keep].astype(dtype),
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=PANEL_COLUMNS).astype({'ticker': pd.CategoricalDtype(tickers), 'date': 'datetime64[ns]',
+                                                           **dict.fromkeys(PANEL_COLUMNS[2:], dtype)})
+    panel = pd.concat(frames, ignore_index=True)
+    panel['date'] = pd.to_datetime(panel['date'])
+    return panel
+
+
+def add_forward_vars(panel, horizon):
+    """
+    The panel with each ticker's measures horizon rows ahead, and the percent change in RV to them.
+
+    Adds fwd_rv20_daily, fwd_rv20_weekly, fwd_vcr, fwd_TR, rv_daily_pct_chg and
+    rv_weekly_pct_chg, NaN where a ticker's series runs out. One grouped shift
+    over the whole panel does every ticker; a panel whose rows for some
+    ticker are not in date order (compute_panel's always are) is sorted first.
+    """
+    if not panel.groupby('ticker', observed=True)['date'].is_monotonic_increasing.all():
+        panel = panel.sort_values(['ticker', 'date'], kind='stable')
+
+    ahead = panel.groupby('ticker', observed=True, sort=False)[['rv20_daily', 'rv20_weekly', 'vcr20', 'TR']].shift(-horizon)
+    panel = panel.assign(
+        fwd_rv20_daily=ahead['rv20_daily'],
+        fwd_rv20_weekly=ahead['rv20_weekly'],
+        fwd_vcr=ahead['vcr20'],
+        fwd_TR=ahead['TR'],
+    )
+    # Percent change in RV: (forward - current) / current
+    panel['rv_daily_pct_chg'] = (panel['fwd_rv20_daily'] - panel['rv20_daily']) / panel['rv20_daily'] * 100
+    panel['rv_weekly_pct_chg'] = (panel['fwd_rv20_weekly'] - panel['rv20_weekly']) / panel['rv20_weekly'] * 100
+    return panel
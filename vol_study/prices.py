@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+An on-disk cache of adjusted closes in front of the price download.
+
+PriceStore keeps one Parquet file of closes per ticker, plus a small JSON
+index recording which date range has been asked of the source for each
+ticker. A request only goes to the source for the dates the cache does not
+cover yet: normally just the bars after the last cached one, so a warm cache
+is served from disk. The source is pluggable: YahooSource wraps
+yf.download, CSVSource serves a local (dates x tickers) file for offline
+runs and tests, and BatchedSource spreads a large universe over concurrent,
+retried batches of any other source.
+
+Dates follow yf.download: start is inclusive and end exclusive, with
+end=None meaning up to today. Today's bar is still moving, so it is never
+fetched or cached; end=None stops at yesterday's close.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def _closes_frame(raw, tickers):
+    # yf.download gives (field, ticker) columns for a list of tickers, or bare fields for a single one
+    if isinstance(raw.columns, pd.MultiIndex):
+        return raw['Close']
+    closes = raw[['Close']]
+    closes.columns = list(tickers)
+    return closes
+
+
+class YahooSource:
+    """Adjusted closes from Yahoo Finance through yfinance."""
+
+    def __init__(self, progress=False):
+        self.progress = progress
+
+    def fetch(self, tickers, start, end):
+        """(dates x tickers) DataFrame of closes from start up to end; tickers with no data may be missing or all NaN."""
+        import yfinance as yf
+
+        raw = yf.download(list(tickers), start=start, end=end, auto_adjust=True, progress=self.progress)
+        return _closes_frame(raw, tickers)
+
+
+class CSVSource:
+    """Closes from a CSV with a date column followed by one column per ticker, read once."""
+
+    def __init__(self, path, date_column=0):
+        self.closes = pd.read_csv(path, index_col=date_column, parse_dates=True).sort_index()
+
+    def fetch(self, tickers, start, end):
+        rows = self.closes.index >= pd.Timestamp(start)
+        if end is not None:
+            rows &= self.closes.index < pd.Timestamp(end)
+        return self.closes.loc[rows, [t for t in tickers if t in self.closes.columns]]
+
+
+class BatchedSource:
+    """
+    Any source's fetch split into batches of tickers, run on a thread pool.
+
+    A batch that raises, or a ticker that comes back missing or all NaN, is
+    retried up to retries times, after backoff, 2*backoff, ... seconds, in
+    batches half as large each time and one ticker at a time on the last
+    try, so one bad symbol cannot sink the rest.
+    fetch returns the tickers that did arrive, aligned on the union of
+    their dates; the others are in self.failed, with the last error seen.
+    """
+
+    def __init__(self, source, batch_size=50, max_workers=4, retries=3, backoff=1.0, sleep=time.sleep):
+        self.source = source
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.failed = {}
+
+    def fetch(self, tickers, start, end):
+        pending = list(dict.fromkeys(tickers))
+        self.failed = {}
+        if not pending:
+            return pd.DataFrame()
+        columns = {}
+        errors = {}
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.sleep(self.backoff * 2**(attempt - 1))
+            size = 1 if attempt == self.retries else max(1, self.batch_size // 2**attempt)
+            batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                futures = [pool.submit(self.source.fetch, batch, start, end) for batch in batches]
+                for batch, future in zip(batches, futures):
+                    try:
+                        closes = future.result()
+                    except Exception as e:
+                        errors.update(dict.fromkeys(batch, f'{type(e).__name__}: {e}'))
+                        continue
+                    for ticker in batch:
+                        if ticker in closes.columns and closes[ticker].notna().any():
+                            columns[ticker] = closes[ticker]
+                        else:
+                            errors[ticker] = 'no data'
+            pending = [ticker for ticker in pending if ticker not in columns]
+            if not pending:
+                break
+
+        self.failed = {ticker: errors[ticker] for ticker in pending}
+        if not columns:
+            return pd.DataFrame()
+        return pd.concat([columns[ticker] for ticker in tickers if ticker in columns], axis=1).sort_index()
+
+
+class PriceStore:
+    """
+    Cached adjusted closes for any set of tickers.
+
+    directory holds <ticker>.parquet files and index.json; source defaults
+    to YahooSource() in concurrent batches with retries (BatchedSource).
+    Parquet needs pyarrow or fastparquet.
+    """
+
+    def __init__(self, directory, source=None, tolerance=1e-6):
+        self.directory = os.path.expanduser(directory)
+        self.source = BatchedSource(YahooSource()) if source is None else source
+        self.tolerance = tolerance
+        self._index_path = os.path.join(self.directory, 'index.json')
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    def _path(self, ticker):
+        return os.path.join(self.directory, f'{ticker}.parquet')
+
+    def _read(self, ticker):
+        if not os.path.exists(self._path(ticker)):
+            return pd.Series(dtype=float, name=ticker)
+        return pd.read_parquet(self._path(ticker))['close'].rename(ticker)
+
+    def _write(self, ticker, closes, start, end):
+        # only the dates up to the last bar the source had are covered, so bars published later are still fetched
+        end = min(end, closes.index[-1] + pd.Timedelta(days=1))
+        closes.rename('close').rename_axis('date').to_frame().to_parquet(self._path(ticker))
+        self.index[ticker] = {'start': start.strftime('%Y-%m-%d'), 'end': end.strftime('%Y-%m-%d')}
+
+    def _fetch(self, requests):
+        # one source call per distinct (start, end), which is usually one call for the whole update
+        today = pd.Timestamp.today().normalize()
+        fetched = {}
+        groups = {}
+        for ticker, window in requests.items():
+            groups.setdefault(window, []).append(ticker)
+        for (start, end), tickers in groups.items():
+            closes = self.source.fetch(tickers, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+            for ticker in tickers:
+                if ticker in closes.columns:
+                    series = closes[ticker].dropna().astype(float)
+                    fetched[ticker] = series[series.index < today]
+                else:
+                    fetched[ticker] = pd.Series(dtype=float, name=ticker)
+        return fetched
+
+    def update(self, tickers, start, end=None, full=False):
+        """
+        Fetch whatever the cache is missing for tickers between start and end.
+
+        Bars after the last cached one are fetched from that bar on. If the
+        refetched last bar no longer matches the cached close (the adjusted
+        history moved, after a dividend or split), the ticker's whole history
+        is fetched again; full=True does that for every ticker. A ticker the
+        source returns nothing for is not recorded, so it is asked for again
+        next time. Returns the tickers that failed.
+        """
+        start = pd.Timestamp(start)
+        end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+
+        requests = {}
+        for ticker in tickers:
+            covered = self.index.get(ticker)
+            if full or covered is None:
+                requests[ticker] = (start, end)
+                continue
+            covered_start, covered_end = pd.Timestamp(covered['start']), pd.Timestamp(covered['end'])
+            if start < covered_start:
+                requests[ticker] = (start, max(end, covered_end))
+            elif end > covered_end:
+                cached = self._read(ticker)
+                requests[ticker] = (cached.index[-1] if len(cached) else covered_end, end)
+
+        failed = []
+        refetch = {}
+        for ticker, closes in self._fetch(requests).items():
+            request_start, request_end = requests[ticker]
+            covered = self.index.get(ticker)
+            if covered is None or full or request_start < pd.Timestamp(covered['start']):
+                if closes.empty:
+                    failed.append(ticker)
+                else:
+                    self._write(ticker, closes, request_start, request_end)
+                continue
+
+            # a tail request starts at the last cached bar, so a working source always returns something
+            if closes.empty:
+                failed.append(ticker)
+                continue
+            cached = self._read(ticker)
+            overlap = closes.index.intersection(cached.index)
+            if len(overlap) and not np.allclose(closes[overlap], cached[overlap], rtol=self.tolerance, atol=0):
+                refetch[ticker] = (pd.Timestamp(covered['start']), request_end)
+                continue
+            self._write(ticker, closes.combine_first(cached), pd.Timestamp(covered['start']), max(request_end, pd.Timestamp(covered['end'])))
+
+        for ticker, closes in self._fetch(refetch).items():
+            if closes.empty:
+                failed.append(ticker)
+            else:
+                self._write(ticker, closes, *refetch[ticker])
+
+        with open(self._index_path, 'w') as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        return failed
+
+    def get(self, tickers, start, end=None, update=True):
+        """
+        (dates x tickers) DataFrame of cached closes between start and end.
+
+        With update=False nothing is fetched, so it works offline on whatever
+        is cached. Tickers with no data are left out, and dates on which no
+        ticker has a close are dropped.
+        """
+        if update:
+            self.update(tickers, start, end)
+        series = [self._read(ticker) for ticker in tickers]
+        if not any(len(s) for s in series):
+            return pd.DataFrame()
+        prices = pd.concat([s for s in series if len(s)], axis=1).sort_index()
+        rows = prices.index >= pd.Timestamp(start)
+        if end is not None:
+            rows &= prices.index < pd.Timestamp(end)
+        return prices.loc[rows].dropna(how='all').rename_axis('Date')
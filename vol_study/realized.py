@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Rolling realized volatility estimators, annualized in percent.
+
+Every estimator is a rolling mean of a per-day variance term computed with
+pandas' native rolling kernels, so a whole (dates x tickers) DataFrame is
+done in one pass with no Python call per window. Series work too. As with
+rolling(window).apply, a window containing a missing value gives NaN.
+"""
+
+import numpy as np
+
+
+def log_returns(prices):
+    """Daily log returns of a price Series or DataFrame; the first row is NaN."""
+    return np.log(prices / prices.shift(1))
+
+
+def _annualized(mean_variance, ann_factor):
+    # rolling sums update incrementally, so a window of tiny terms can come out a hair below zero
+    return np.sqrt(mean_variance.clip(lower=0)) * np.sqrt(ann_factor) * 100
+
+
+def zero_mean_vol(log_ret, window, ann_factor=252):
+    """sqrt(mean(r**2)) over each window: the RV20/RV60 of the studies, which assume zero drift."""
+    return _annualized((log_ret**2).rolling(window).mean(), ann_factor)
+
+
+def close_to_close_vol(log_ret, window, ann_factor=252):
+    """The sample st dev of the returns in each window (demeaned, ddof=1)."""
+    return _annualized(log_ret.rolling(window).var(), ann_factor)
+
+
+def parkinson_vol(high, low, window, ann_factor=252):
+    """Parkinson's high-low estimator: mean(ln(H/L)**2) / (4 ln 2)."""
+    range_sq = np.log(high / low)**2
+    return _annualized(range_sq.rolling(window).mean() / (4 * np.log(2)), ann_factor)
+
+
+def garman_klass_vol(open_, high, low, close, window, ann_factor=252):
+    """Garman-Klass: mean(ln(H/L)**2 / 2 - (2 ln 2 - 1) ln(C/O)**2), ignoring overnight gaps."""
+    daily_variance = .5 * np.log(high / low)**2 - (2 * np.log(2) - 1) * np.log(close / open_)**2
+    return _annualized(daily_variance.rolling(window).mean(), ann_factor)